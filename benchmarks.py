@@ -0,0 +1,555 @@
+"""
+Benchmarks for Spell Timer.
+Runs every case by default, or the ones named:
+    python benchmarks.py
+    python benchmarks.py parse spells --json new.json --compare base.json
+
+- endpoints:   bytes / latency / JSON decode cost per Live Client endpoint,
+               against a simulator.py replay of a 40 minute payload
+               (--live: the real client on 127.0.0.1:2999).
+- parse:       JSON decode, RosterDiffer hash and parse_enemies on payloads
+               from early game to 40 minutes (--recording: frames of a real match).
+- spells:      spell name resolution across the full DDragon spell list
+               (cache/summoner.json if present), substring chain vs. index.
+- engine:      TimerEngine roster update, start/reset, snapshot and expiry, without Tk.
+- icons:       AssetManager.load_icon cold / disk-warm / memory-warm, round and square.
+- canvas-text: Tcl calls and time per countdown redraw, old 9-item text
+               outline vs. the cached glyph swap.
+- tick:        TimerScheduler wakeup cost with 10 running timers.
+- build-rows:  OverlayApp._build_enemy_rows for 5 / 10 / 15 enemies (10+ use the compact
+               layout), widget tree vs. single canvas, and _reconcile_rows when one champion changes.
+- sync:        TimerSync hub fan-out latency to 1 / 10 / 40 localhost subscribers.
+
+Cases that need Tk are reported as skipped without a display (use Xvfb on Linux).
+--json writes {"meta": {...}, "results": {case: {metric: value}}}; --compare
+prints the change per metric against such a file from another commit.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import asyncio
+import argparse
+import itertools
+import platform
+import tempfile
+import subprocess
+
+import simulator
+from main import (AssetManager, Config, GameDataManager, OverlayApp, RosterDiffer,
+                  SpellResolver, SpellTimerWidget, TimerEngine, TimerScheduler, TimerSync)
+
+class SkipCase(Exception):
+    """Raised by a case that can't run in this environment."""
+
+_tk_root = None
+
+def _get_tk_root():
+    global _tk_root
+    if _tk_root is None:
+        import tkinter as tk
+        try:
+            _tk_root = tk.Tk()
+        except tk.TclError as e:
+            raise SkipCase(f"no display ({e})")
+        _tk_root.withdraw()
+    return _tk_root
+
+def _time_per_call(fn, rounds):
+    """Average microseconds per fn() call."""
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - t0) * 1e6 / rounds
+
+# --- PAYLOADS ---
+_CHAMPS = ["Ahri", "Garen", "Lux", "Jinx", "Thresh", "Darius", "Ornn", "Zed", "Caitlyn", "Leona"]
+_SPELLS = ["SummonerFlash", "SummonerTeleport", "SummonerDot", "SummonerHeal", "SummonerExhaust"]
+_ITEMS = [1055, 3006, 3158, 3031, 3072, 3153, 3171, 6672, 3046, 3036]
+
+def _synthetic_payload(minutes):
+    """allgamedata-shaped payload about as large as a real one `minutes` into a match."""
+    roster = []
+    for i, champ in enumerate(_CHAMPS):
+        roster.append(simulator._player_entry({
+            "champ": champ, "team": "ORDER" if i < 5 else "CHAOS",
+            "spells": [_SPELLS[i % 5], _SPELLS[(i + 1) % 5]],
+            "items": _ITEMS[i % 3:i % 3 + min(1 + minutes // 6, 7)],
+        }))
+    # Roughly a dozen events a minute (kills, wards, turrets, objectives)
+    events = [{"EventID": 0, "EventName": "GameStart", "EventTime": 0.0}]
+    for n in range(1, minutes * 12):
+        events.append({"EventID": n, "EventName": "ChampionKill", "EventTime": n * 5.0,
+                       "KillerName": roster[n % 10]["riotId"], "VictimName": roster[(n + 5) % 10]["riotId"],
+                       "Assisters": [roster[(n + 1) % 10]["riotId"]]})
+    return {
+        "activePlayer": {"riotId": roster[0]["riotId"], "summonerName": roster[0]["summonerName"],
+                         "championStats": {"abilityHaste": 0.0}, "level": min(1 + minutes // 2, 18)},
+        "allPlayers": roster,
+        "events": {"Events": events},
+        "gameData": {"gameMode": "CLASSIC", "gameTime": minutes * 60.0, "mapName": "Map11"},
+    }
+
+# --- ENDPOINTS ---
+def _measure_endpoint(url, rounds):
+    """Returns (avg bytes, avg request ms, avg json decode ms) for one endpoint."""
+    session = GameDataManager._get_session()
+    total_bytes = 0
+    total_req = 0.0
+    total_decode = 0.0
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        resp = session.get(url, timeout=2)
+        body = resp.content
+        t1 = time.perf_counter()
+        resp.json()
+        t2 = time.perf_counter()
+        total_bytes += len(body)
+        total_req += t1 - t0
+        total_decode += t2 - t1
+    return total_bytes / rounds, total_req * 1000 / rounds, total_decode * 1000 / rounds
+
+def bench_endpoints(args):
+    """Compares the full allgamedata payload with the lightweight endpoints used by poll()."""
+    base = Config.LCL_BASE_URL
+    server = None
+    if not args.live:
+        server, _ = simulator.serve([(0.0, simulator.IN_GAME, _synthetic_payload(40))], port=0, use_tls=False)
+        base = f"http://127.0.0.1:{server.server_address[1]}/liveclientdata"
+    endpoints = [
+        ("allgamedata", base + "/allgamedata"),
+        ("playerlist", base + "/playerlist"),
+        ("activeplayername", base + "/activeplayername"),
+    ]
+    print(f"{'endpoint':<18}{'bytes':>10}{'request ms':>12}{'decode ms':>11}")
+    results = {}
+    try:
+        for name, url in endpoints:
+            try:
+                size, req_ms, dec_ms = _measure_endpoint(url, args.rounds)
+            except Exception as e:
+                print(f"{name:<18} failed: {e}")
+                continue
+            results[f"{name}.bytes"] = size
+            results[f"{name}.request_ms"] = req_ms
+            results[f"{name}.decode_ms"] = dec_ms
+            print(f"{name:<18}{size:>10.0f}{req_ms:>12.2f}{dec_ms:>11.3f}")
+    finally:
+        if server: server.shutdown()
+
+    if "allgamedata.bytes" in results and "playerlist.bytes" in results:
+        ratio = results["allgamedata.bytes"] / max(results["playerlist.bytes"], 1)
+        print(f"\nplayerlist is {ratio:.1f}x smaller than allgamedata")
+    return results
+
+# --- PARSE ---
+def _parse_payloads(args):
+    if not args.recording:
+        return [(f"{m}min", _synthetic_payload(m)) for m in (1, 10, 20, 40)]
+    frames = [f for f in simulator.load_recording(args.recording) if f[1] == simulator.IN_GAME]
+    if not frames:
+        raise SkipCase(f"no in-game frames in {args.recording}")
+    picks = [frames[0], frames[len(frames) // 2], frames[-1]]
+    return [(f"t{int(t)}s", data) for t, _, data in picks]
+
+def bench_parse(args):
+    """Per-poll cost of turning a payload into the enemy roster."""
+    rounds = args.rounds * 50
+    results = {}
+    print(f"{'payload':<10}{'bytes':>10}{'decode us':>11}{'hash us':>9}{'parse us':>10}")
+    for label, payload in _parse_payloads(args):
+        raw = json.dumps(payload)
+        decode_us = _time_per_call(lambda: json.loads(raw), rounds)
+        hash_us = _time_per_call(lambda: RosterDiffer._roster_hash(payload), rounds)
+        parse_us = _time_per_call(lambda: GameDataManager.parse_enemies(payload), rounds)
+        results[f"{label}.bytes"] = len(raw)
+        results[f"{label}.decode_us"] = decode_us
+        results[f"{label}.hash_us"] = hash_us
+        results[f"{label}.parse_us"] = parse_us
+        print(f"{label:<10}{len(raw):>10}{decode_us:>11.1f}{hash_us:>9.1f}{parse_us:>10.1f}")
+    return results
+
+# --- SPELLS ---
+def _legacy_clean_spell_name(raw):
+    """The original if-chain resolver, kept for comparison."""
+    if not raw: return "Unknown"
+    raw_lower = raw.lower()
+    if "teleport" in raw_lower: return "SummonerTeleport"
+    if "smite" in raw_lower: return "SummonerSmite"
+    if "flash" in raw_lower: return "SummonerFlash"
+    if "ignite" in raw_lower or "dot" in raw_lower: return "SummonerDot"
+    if "barrier" in raw_lower: return "SummonerBarrier"
+    if "heal" in raw_lower: return "SummonerHeal"
+    if "exhaust" in raw_lower: return "SummonerExhaust"
+    if "cleanse" in raw_lower or "boost" in raw_lower: return "SummonerBoost"
+    if "ghost" in raw_lower or "haste" in raw_lower: return "SummonerHaste"
+    parts = raw.split("_")
+    for p in reversed(parts):
+        if p.startswith("Summoner") and p != "SummonerSpell": return p
+    return "Unknown"
+
+def _spell_samples():
+    """Raw names as the Live Client reports them, for every known spell."""
+    try:
+        with open(Config.SPELL_DATA_CACHE, "r", encoding="utf-8") as f:
+            data = json.load(f).get("data", {})
+    except (OSError, ValueError):
+        data = {}
+    SpellResolver.rebuild(data)
+    ids = list(data) or sorted(set(SpellResolver.ALIASES.values()))
+    samples = []
+    for spell_id in ids:
+        samples.append(f"GeneratedTip_SummonerSpell_{spell_id}_DisplayName")
+        name = data.get(spell_id, {}).get("name")
+        if name: samples.append(name)
+    return samples
+
+def bench_spells(args):
+    """Resolution cost per name: legacy chain, index cold (no memo) and memoized."""
+    samples = _spell_samples()
+    rounds = args.rounds * 100
+
+    def run(resolve, clear_memo=False):
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            if clear_memo: SpellResolver._memo = {}
+            for raw in samples:
+                resolve(raw)
+        return (time.perf_counter() - t0) * 1e9 / (rounds * len(samples))
+
+    results = {
+        "names": len(samples),
+        "legacy.ns_per_lookup": run(_legacy_clean_spell_name),
+        "index.ns_per_lookup": run(SpellResolver.resolve, clear_memo=True),
+        "memoized.ns_per_lookup": run(SpellResolver.resolve),
+    }
+    print(f"{len(samples)} spell names, {rounds} rounds")
+    print(f"{'resolver':<12}{'ns/lookup':>12}")
+    for name in ("legacy", "index", "memoized"):
+        print(f"{name:<12}{results[name + '.ns_per_lookup']:>12.0f}")
+
+    results["index.unresolved"] = len({raw for raw in samples if SpellResolver.resolve(raw) == "Unknown"})
+    results["legacy.unresolved"] = len({raw for raw in samples if _legacy_clean_spell_name(raw) == "Unknown"})
+    print(f"Unresolved: index {results['index.unresolved']}, legacy {results['legacy.unresolved']}")
+    return results
+
+# --- ENGINE ---
+def bench_engine(args):
+    """TimerEngine on its own (no Tk): roster update, start/reset, snapshot and expiry with 5 enemies."""
+    # No haste: cooldown() logs every haste-reduced start, which would dominate the numbers
+    enemies = [dict(e, haste=0) for e in GameDataManager.parse_enemies(_synthetic_payload(20))]
+    engine = TimerEngine()
+    engine.sync_clock(1200.0, time.monotonic())
+    keys = [(e['champ'], e[slot]) for e in enemies for slot in ("spell1", "spell2")]
+    rounds = args.rounds * 100
+
+    def start_reset():
+        for champ, spell in keys:
+            engine.start(champ, spell)
+        for champ, spell in keys:
+            engine.reset(champ, spell)
+
+    results = {
+        "update_roster_us": _time_per_call(lambda: engine.update_roster(enemies), rounds),
+        "start_reset_us": _time_per_call(start_reset, rounds) / len(keys),
+    }
+    for champ, spell in keys:
+        engine.start(champ, spell)
+    results["snapshot_us"] = _time_per_call(engine.snapshot, rounds)
+    results["expire_due_us"] = _time_per_call(engine.expire_due, rounds)
+    print(f"{len(keys)} spells, {rounds} rounds")
+    for name, value in results.items():
+        print(f"{name:<20}{value:>10.2f}")
+    return results
+
+# --- ICONS ---
+def bench_icons(args):
+    """load_icon through each cache level, for a round champion and a square spell icon."""
+    _get_tk_root() # PhotoImage needs an interpreter
+    size = (Config.ICON_SIZE, Config.ICON_SIZE)
+    variants = [("round", "champions", "Ahri", True), ("square", "spells", "SummonerFlash", False)]
+    cache_dir = tempfile.mkdtemp(prefix="spelltimer-bench-")
+    saved_dir = Config.ICON_CACHE_DIR
+    Config.ICON_CACHE_DIR = cache_dir
+    results = {}
+    print(f"{'icon':<8}{'cold us':>10}{'disk us':>10}{'memory us':>11}")
+    try:
+        for label, folder, name, is_round in variants:
+            def load():
+                AssetManager.load_icon(folder, name, size, is_round)
+
+            def cold():
+                shutil.rmtree(cache_dir, ignore_errors=True)
+                AssetManager._icon_cache.clear()
+                load()
+
+            def disk():
+                AssetManager._icon_cache.clear()
+                load()
+
+            cold_us = _time_per_call(cold, args.rounds)
+            disk_us = _time_per_call(disk, args.rounds * 5)
+            memory_us = _time_per_call(load, args.rounds * 50)
+            results[f"{label}.cold_us"] = cold_us
+            results[f"{label}.disk_us"] = disk_us
+            results[f"{label}.memory_us"] = memory_us
+            print(f"{label:<8}{cold_us:>10.0f}{disk_us:>10.0f}{memory_us:>11.2f}")
+    finally:
+        Config.ICON_CACHE_DIR = saved_dir
+        AssetManager._icon_cache.clear()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+    return results
+
+# --- CANVAS TEXT ---
+class _TclCallCounter:
+    """Wraps a widget's Tcl interpreter and counts the commands sent through it."""
+    def __init__(self, tk_app):
+        self._tk = tk_app
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self._tk.call(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._tk, name)
+
+_OUTLINE_OFFSETS = [(-1, -1), (0, -1), (1, -1), (-1,  0), (1,  0), (-1,  1), (0,  1), (1,  1)]
+
+def _legacy_draw_outlined_text(canvas, text):
+    """The original implementation: delete + 9 x create_text on every tick."""
+    canvas.delete("timer_text")
+    cx, cy = Config.ICON_SIZE // 2, Config.ICON_SIZE // 2
+    font_spec = SpellTimerWidget._get_adaptive_font(text)
+    for ox, oy in _OUTLINE_OFFSETS:
+        canvas.create_text(cx + ox, cy + oy, text=text, font=font_spec, fill=Config.COLOR_TEXT_OUTLINE, tags="timer_text", anchor="center")
+    canvas.create_text(cx, cy, text=text, font=font_spec, fill=Config.COLOR_TEXT_ACTIVE, tags="timer_text", anchor="center")
+
+def _countdown_labels(seconds):
+    labels = []
+    for remaining in range(seconds, 0, -1):
+        m, s = divmod(remaining, 60)
+        labels.append(f"{m}:{s:02}" if remaining >= 60 else str(remaining))
+    return labels
+
+class _BenchApp:
+    """Stands in for OverlayApp as the widgets' app_ref."""
+    def __init__(self, root):
+        self.engine = TimerEngine()
+        self.timers = TimerScheduler(root, self.engine.clock)
+
+def bench_canvas_text(args):
+    """Redraws a full 300 s countdown on one widget, the old way and the current way."""
+    root = _get_tk_root()
+    labels = _countdown_labels(300)
+    active_timers = 10  # Full enemy team with both spells on cooldown
+
+    widget = SpellTimerWidget(root, "Bench", "SummonerFlash", _BenchApp(root))
+    # Warm the glyph cache so the loop measures steady-state ticks
+    for text in labels:
+        widget._draw_outlined_text(text)
+    variants = [
+        ("legacy", lambda text: _legacy_draw_outlined_text(widget, text)),
+        ("glyph", widget._draw_outlined_text),
+    ]
+    results = {}
+    print(f"{'variant':<10}{'tcl calls/tick':>16}{'tcl calls/s (x10)':>20}{'us/tick':>10}")
+    for name, draw in variants:
+        counter = _TclCallCounter(widget.tk)
+        widget.tk = counter
+        t0 = time.perf_counter()
+        for _ in range(args.rounds):
+            for text in labels:
+                draw(text)
+            widget._shown_text = None
+        elapsed = time.perf_counter() - t0
+        widget.tk = counter._tk
+        ticks = args.rounds * len(labels)
+        per_tick = counter.calls / ticks
+        results[f"{name}.tcl_calls_per_tick"] = per_tick
+        results[f"{name}.us_per_tick"] = elapsed * 1e6 / ticks
+        print(f"{name:<10}{per_tick:>16.2f}{per_tick * active_timers:>20.1f}{elapsed * 1e6 / ticks:>10.1f}")
+    widget.destroy()
+    return results
+
+# --- TICK ---
+def bench_tick(args):
+    """One TimerScheduler wakeup with 10 running timers whose labels all change."""
+    root = _get_tk_root()
+    app = _BenchApp(root)
+    widgets = [SpellTimerWidget(root, f"Champ{i}", "SummonerFlash", app) for i in range(10)]
+    for w in widgets:
+        w._start_timer(app.engine.start(w.champ_name, w.spell_name))
+
+    def tick():
+        for w in widgets:
+            w._shown_text = None # As if every label rolled over this second
+        app.timers._tick()
+
+    tick_us = _time_per_call(tick, args.rounds * 20)
+    app.timers.clear()
+    for w in widgets:
+        w.destroy()
+    results = {"tick_us": tick_us, "us_per_timer": tick_us / len(widgets)}
+    print(f"10 active timers: {tick_us:.1f} us/tick, {results['us_per_timer']:.1f} us per timer")
+    return results
+
+# --- BUILD ROWS ---
+def _arena_roster(count):
+    """`count` enemies in teams of two, as in Arena; 5 is a regular match."""
+    if count == 5:
+        return GameDataManager.parse_enemies(_synthetic_payload(1))
+    return [{"champ": _CHAMPS[i % len(_CHAMPS)], "team": f"TEAM{i // 2}", "spell1": _SPELLS[i % 5],
+             "spell2": _SPELLS[(i + 1) % 5], "haste": 0} for i in range(count)]
+
+def bench_build_rows(args):
+    """Enemy panel with each renderer and roster size: first build (cold icon cache),
+    rebuilds, and reconciling a roster where one champion was swapped."""
+    root = _get_tk_root() # Shared: load_icon's PhotoImages belong to the first interpreter
+    saved_renderer = Config.RENDERER
+    results = {}
+    print(f"{'renderer':<10}{'enemies':>8}{'first ms':>10}{'steady ms':>11}{'swap ms':>9}")
+    try:
+        for renderer in ("widgets", "canvas"):
+            for count in (5, 10, 15):
+                enemies = _arena_roster(count)
+                swapped = enemies[:-1] + [dict(enemies[-1], champ="Teemo")]
+                Config.RENDERER = renderer
+                AssetManager._icon_cache.clear()
+                app = OverlayApp(start_services=False, root=root)
+
+                def build():
+                    app._build_enemy_rows(enemies)
+                    app.root.update_idletasks()
+
+                first_ms = _time_per_call(build, 1) / 1000
+                steady_ms = _time_per_call(build, args.rounds) / 1000
+                rosters = itertools.cycle([swapped, enemies])
+
+                def swap():
+                    app._reconcile_rows(next(rosters))
+                    app.root.update_idletasks()
+
+                swap_ms = _time_per_call(swap, args.rounds) / 1000
+                app.timers.clear()
+                app.container.destroy()
+                results[f"{renderer}.{count}.first_ms"] = first_ms
+                results[f"{renderer}.{count}.steady_ms"] = steady_ms
+                results[f"{renderer}.{count}.swap_ms"] = swap_ms
+                print(f"{renderer:<10}{count:>8}{first_ms:>10.1f}{steady_ms:>11.2f}{swap_ms:>9.2f}")
+    finally:
+        Config.RENDERER = saved_renderer
+    return results
+
+# --- SYNC ---
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def bench_sync(args):
+    """Time from a hub publish until the last of N subscribers has read the message."""
+    hub = TimerSync(lambda msg: None)
+    hub.serve("127.0.0.1", 0)
+    for _ in range(200):
+        if hub.address: break
+        time.sleep(0.01)
+    else:
+        raise SkipCase("hub did not start")
+    rounds = args.rounds * 20
+    stamps = itertools.count() # The hub drops messages older than the last one per spell
+
+    async def run(subscribers):
+        streams = [await asyncio.open_connection(*hub.address) for _ in range(subscribers)]
+        for reader, writer in streams:
+            writer.write(b'{"type": "hello", "match": "bench"}\n')
+            await reader.readline() # snapshot
+        latencies = []
+        for _ in range(rounds):
+            at = float(next(stamps))
+            start = time.perf_counter()
+            hub.publish({"type": "timer", "match": "bench", "champ": "Ahri", "spell": "SummonerFlash",
+                         "deadline": 300.0 + at, "at": at})
+            await asyncio.gather(*(reader.readline() for reader, _ in streams))
+            latencies.append((time.perf_counter() - start) * 1000)
+        for _, writer in streams:
+            writer.close()
+        return latencies
+
+    results = {}
+    print(f"{rounds} messages")
+    print(f"{'subscribers':<13}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}")
+    for subscribers in (1, 10, 40):
+        latencies = asyncio.run(run(subscribers))
+        p50, p95 = _percentile(latencies, 0.5), _percentile(latencies, 0.95)
+        print(f"{subscribers:<13}{p50:>9.3f}{p95:>9.3f}{max(latencies):>9.3f}")
+        results[f"fanout_{subscribers}_p50_ms"] = p50
+        results[f"fanout_{subscribers}_p95_ms"] = p95
+    return results
+
+CASES = {
+    "endpoints": bench_endpoints,
+    "parse": bench_parse,
+    "spells": bench_spells,
+    "engine": bench_engine,
+    "icons": bench_icons,
+    "canvas-text": bench_canvas_text,
+    "tick": bench_tick,
+    "build-rows": bench_build_rows,
+    "sync": bench_sync,
+}
+
+def _meta():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+def _compare(path, results):
+    """Prints the change per metric against a previous --json run."""
+    with open(path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    print(f"\n=== vs. {path} ({baseline.get('meta', {}).get('commit')}) ===")
+    for case, metrics in results.items():
+        old_metrics = baseline.get("results", {}).get(case, {})
+        for metric, value in metrics.items():
+            old = old_metrics.get(metric)
+            if not isinstance(value, (int, float)) or not isinstance(old, (int, float)) or not old:
+                continue
+            print(f"{case + '.' + metric:<40}{old:>12.2f} -> {value:>12.2f} ({(value - old) / old * 100:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Spell Timer benchmarks")
+    parser.add_argument("cases", nargs="*", metavar="case", help=f"One of: {', '.join(CASES)} (default: all)")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--live", action="store_true", help="endpoints: query the running client instead of a replay")
+    parser.add_argument("--recording", help="parse: use frames from a simulator.py recording")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--compare", help="Compare results against a previous --json file")
+    args = parser.parse_args()
+    unknown = [c for c in args.cases if c not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s): {', '.join(unknown)}")
+
+    results = {}
+    for case in args.cases or list(CASES):
+        print(f"\n=== {case} ===")
+        try:
+            results[case] = CASES[case](args)
+        except SkipCase as e:
+            print(f"skipped: {e}")
+            results[case] = {"skipped": str(e)}
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"meta": _meta(), "results": results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+    if args.compare:
+        _compare(args.compare, results)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -49,7 +49,8 @@ echo Name: Spell Timer
 
 pyinstaller --noconsole --onefile --name "Spell Timer" ^
  --icon "ico\icon.ico" ^
- --add-data "assets;assets" ^
+ --add-data "assets\icons.atlas;assets" ^
+ --add-data "assets\version.txt;assets" ^
  --add-data "ico;ico" ^
  --hidden-import=requests ^
  --hidden-import=pystray ^
@@ -1,19 +1,49 @@
 """
 Smart Asset Downloader for LoL Tracker.
 Checks for LoL updates via DDragon.
-- If version changed: Redownloads ALL assets to ensure latest art.
+- If version changed: Revalidates ALL assets with conditional requests and only
+  rewrites files whose content changed (tracked in assets/manifest.json).
 - If version same: Downloads only MISSING assets.
+- Packs every icon into assets/icons.atlas (see build_atlas) for the app/EXE.
+
+Downloads run on a small thread pool sharing one pooled session.
+Use --base-url to point the sync at a local DDragon stand-in, e.g. a
+`python -m http.server` serving api/versions.json and cdn/<ver>/... paths.
 """
 
 import os
+import sys
+import json
+import time
+import struct
+import hashlib
+import argparse
+import threading
 import requests
 import shutil
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # --- CONFIGURATION ---
+DDRAGON_BASE = "https://ddragon.leagueoflegends.com"
+MAX_WORKERS = 8        # Parallel downloads
+MAX_PER_HOST = 6       # Concurrent connections to a single host
+DOWNLOAD_TIMEOUT = 10
+CHUNK_SIZE = 64 * 1024
+
 ASSETS_DIR = "assets"
 CHAMP_DIR = os.path.join(ASSETS_DIR, "champions")
 SPELL_DIR = os.path.join(ASSETS_DIR, "spells")
 VERSION_FILE = os.path.join(ASSETS_DIR, "version.txt")
+# name ("champions/Ahri.png") -> {size, sha256, etag, last_modified, version}
+MANIFEST_FILE = os.path.join(ASSETS_DIR, "manifest.json")
+ATLAS_FILE = os.path.join(ASSETS_DIR, "icons.atlas")
+
+# Atlas layout: MAGIC | uint32 index length | JSON index | raw RGBA pixels
+# Index: {"version": "14.2.1", "icons": {"champions/Ahri": [offset, width, height], ...}}
+# Offsets are relative to the start of the pixel data.
+ATLAS_MAGIC = b"SPTATLS1"
+ATLAS_ICON_SIZE = 64 # Icons larger than this are downscaled (the overlay draws them at ~38px)
 
 # Spells list
 SPELL_IDS = [
@@ -21,11 +51,34 @@ SPELL_IDS = [
     "SummonerTeleport", "SummonerSmite", "SummonerBoost", "SummonerMana", "SummonerHaste", "SummonerSnowball"
 ]
 
-def get_latest_version():
-    """Fetches the latest DDragon version (e.g., '14.2.1')."""
+_session = None
+_session_lock = threading.Lock()
+_host_slots = {}
+
+def get_session():
+    """Shared keep-alive session sized for the worker pool."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+def _host_slot(url):
+    """Semaphore limiting concurrent requests per host."""
+    host = urlsplit(url).netloc
+    with _session_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(MAX_PER_HOST)
+        return _host_slots[host]
+
+def get_latest_version(timeout=DOWNLOAD_TIMEOUT):
+    """Fetches the latest DDragon version (e.g., '14.2.1'). Also used by main.py."""
     try:
-        url = "https://ddragon.leagueoflegends.com/api/versions.json"
-        resp = requests.get(url, timeout=10)
+        url = f"{DDRAGON_BASE}/api/versions.json"
+        resp = get_session().get(url, timeout=timeout)
         resp.raise_for_status()
         return resp.json()[0]
     except Exception as e:
@@ -46,9 +99,9 @@ def save_local_version(version):
 
 def get_champion_list(version):
     """Fetches the list of all champion names for the specific version."""
-    url = f"https://ddragon.leagueoflegends.com/cdn/{version}/data/en_US/champion.json"
+    url = f"{DDRAGON_BASE}/cdn/{version}/data/en_US/champion.json"
     try:
-        resp = requests.get(url, timeout=10)
+        resp = get_session().get(url, timeout=DOWNLOAD_TIMEOUT)
         resp.raise_for_status()
         data = resp.json()
         return list(data['data'].keys())
@@ -56,28 +109,134 @@ def get_champion_list(version):
         print(f"[Error] Could not fetch champion list: {e}")
         return []
 
-def download_file(url, path, force=False):
+def load_manifest():
+    """Reads manifest.json (empty if missing or unreadable)."""
+    try:
+        with open(MANIFEST_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_manifest(manifest):
+    tmp_path = MANIFEST_FILE + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, MANIFEST_FILE)
+
+class SyncStats:
+    """Thread-safe counters for one sync run."""
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.downloaded = 0
+        self.unchanged = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes = 0
+        self.bytes_saved = 0     # Not downloaded: 304 Not Modified
+        self.bytes_unwritten = 0 # Downloaded but not rewritten: same sha256 as the manifest
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, status, nbytes=0, saved=0, unwritten=0):
+        with self._lock:
+            self.done += 1
+            self.bytes += nbytes
+            self.bytes_saved += saved
+            self.bytes_unwritten += unwritten
+            setattr(self, status, getattr(self, status) + 1)
+            return self.done
+
+    def progress_line(self):
+        elapsed = time.perf_counter() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0
+        eta = (self.total - self.done) / rate if rate > 0 else 0
+        return f" [{self.done}/{self.total}] {self.bytes / 1024:.0f} KB, ETA {eta:.1f}s"
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        mb = self.bytes / 1024 / 1024
+        speed = mb / elapsed if elapsed > 0 else 0
+        return (f" [i] {self.downloaded} downloaded, {self.unchanged} unchanged, {self.skipped} present, {self.failed} failed | "
+                f"{mb:.2f} MB in {elapsed:.1f}s ({speed:.2f} MB/s, {self.done / max(elapsed, 1e-9):.1f} files/s), "
+                f"{self.bytes_saved / 1024:.0f} KB not downloaded, {self.bytes_unwritten / 1024:.0f} KB not rewritten")
+
+def download_file(url, path, revalidate=False, entry=None, version=None):
     """
     Downloads a file.
-    :param force: If True, overwrites existing file.
+    :param revalidate: If True, re-checks an existing file with a conditional request
+                       (based on its manifest entry) and only rewrites it if the content changed.
+    :param entry: Manifest entry of the existing file, if any.
+    :return: (status, bytes transferred, bytes not downloaded (304), bytes not rewritten
+             (same sha256), new manifest entry or None) with status
+             "downloaded", "unchanged", "skipped" or "failed".
     """
-    if os.path.exists(path) and not force:
+    exists = os.path.exists(path)
+    if exists and not revalidate:
         # File exists and we don't want to force update
-        return False
-    
+        return "skipped", 0, 0, 0, None
+
+    headers = {}
+    if exists and entry:
+        if entry.get("etag"): headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"): headers["If-Modified-Since"] = entry["last_modified"]
+
+    tmp_path = path + ".part"
     try:
-        resp = requests.get(url, timeout=10)
-        if resp.status_code == 200:
-            with open(path, "wb") as f:
-                f.write(resp.content)
-            print(f" [+] Downloaded: {os.path.basename(path)}")
-            return True
-        else:
-            print(f" [!] Failed (Status {resp.status_code}): {url}")
-            return False
+        with _host_slot(url):
+            with get_session().get(url, timeout=DOWNLOAD_TIMEOUT, stream=True, headers=headers) as resp:
+                if resp.status_code == 304:
+                    return "unchanged", 0, entry.get("size", 0), 0, dict(entry, version=version)
+                if resp.status_code != 200:
+                    print(f" [!] Failed (Status {resp.status_code}): {url}")
+                    return "failed", 0, 0, 0, None
+                nbytes = 0
+                digest = hashlib.sha256()
+                with open(tmp_path, "wb") as f:
+                    for chunk in resp.iter_content(CHUNK_SIZE):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        nbytes += len(chunk)
+                new_entry = {
+                    "size": nbytes,
+                    "sha256": digest.hexdigest(),
+                    "etag": resp.headers.get("ETag"),
+                    "last_modified": resp.headers.get("Last-Modified"),
+                    "version": version,
+                }
+
+        if exists and entry and entry.get("sha256") == new_entry["sha256"]:
+            # Same art under a new version: keep the file on disk untouched
+            os.remove(tmp_path)
+            return "unchanged", nbytes, 0, nbytes, new_entry
+        # Readers never see a half-written image
+        os.replace(tmp_path, path)
+        print(f" [+] Downloaded: {os.path.basename(path)}")
+        return "downloaded", nbytes, 0, 0, new_entry
     except Exception as e:
         print(f" [!] Error downloading {url}: {e}")
-        return False
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return "failed", 0, 0, 0, None
+
+def download_all(jobs, manifest, revalidate=False, version=None, workers=MAX_WORKERS):
+    """Downloads (url, path, manifest name) jobs on a thread pool, updating the manifest."""
+    stats = SyncStats(len(jobs))
+    progress_every = max(len(jobs) // 10, 1)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(download_file, url, path, revalidate, manifest.get(name), version): name
+            for url, path, name in jobs
+        }
+        for future in as_completed(futures):
+            status, nbytes, saved, unwritten, entry = future.result()
+            if entry is not None:
+                manifest[futures[future]] = entry
+            done = stats.record(status, nbytes, saved, unwritten)
+            if done % progress_every == 0 and done < stats.total:
+                print(stats.progress_line())
+    print(stats.summary())
+    return stats
 
 def create_placeholder():
     """Creates a placeholder image if Pillow is available."""
@@ -99,7 +258,60 @@ def create_placeholder():
     except Exception:
         pass # Font issues usually
 
-def main():
+def build_atlas(version):
+    """Packs all downloaded icons into a single mmap-friendly atlas file."""
+    try:
+        from PIL import Image
+    except ImportError:
+        print(" [!] Pillow not installed. Skipping atlas generation.")
+        return False
+
+    icons = {}
+    blobs = []
+    offset = 0
+    for folder, directory in (("champions", CHAMP_DIR), ("spells", SPELL_DIR)):
+        for filename in sorted(os.listdir(directory)):
+            name, ext = os.path.splitext(filename)
+            if ext.lower() != ".png":
+                continue
+            try:
+                img = Image.open(os.path.join(directory, filename)).convert("RGBA")
+            except Exception as e:
+                print(f" [!] Skipping {filename} in atlas: {e}")
+                continue
+            if img.width > ATLAS_ICON_SIZE or img.height > ATLAS_ICON_SIZE:
+                img = img.resize((ATLAS_ICON_SIZE, ATLAS_ICON_SIZE), Image.Resampling.LANCZOS)
+            data = img.tobytes()
+            icons[f"{folder}/{name}"] = [offset, img.width, img.height]
+            blobs.append(data)
+            offset += len(data)
+
+    index = json.dumps({"version": version, "icons": icons}).encode("utf-8")
+    tmp_path = ATLAS_FILE + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(ATLAS_MAGIC)
+        f.write(struct.pack("<I", len(index)))
+        f.write(index)
+        for data in blobs:
+            f.write(data)
+    os.replace(tmp_path, ATLAS_FILE)
+    print(f" [i] Packed {len(icons)} icons into {ATLAS_FILE} ({offset / 1024 / 1024:.1f} MB)")
+    return True
+
+def _positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+def main(argv=None):
+    global DDRAGON_BASE
+    parser = argparse.ArgumentParser(description="Download/update champion and spell icons.")
+    parser.add_argument("--base-url", default=DDRAGON_BASE, help="DDragon root (use a local stand-in for testing)")
+    parser.add_argument("--workers", type=_positive_int, default=MAX_WORKERS, help="Parallel downloads (at least 1)")
+    args = parser.parse_args(argv)
+    DDRAGON_BASE = args.base_url.rstrip("/")
+
     # 1. Setup Directories
     os.makedirs(CHAMP_DIR, exist_ok=True)
     os.makedirs(SPELL_DIR, exist_ok=True)
@@ -112,12 +324,13 @@ def main():
         return
 
     local_ver = get_local_version()
+    manifest = load_manifest()
     
     force_update = False
     
     if local_ver != latest_ver:
         print(f" [!] Update detected! Local: {local_ver} -> Latest: {latest_ver}")
-        print(" [i] Doing a full sync...")
+        print(" [i] Revalidating all files (only changed art is rewritten)...")
         force_update = True
     else:
         print(f" [OK] Version {latest_ver} is up to date.")
@@ -130,24 +343,38 @@ def main():
         print("Failed to get champion list.")
         return
 
+    jobs = []
     for champ in champs:
-        url = f"https://ddragon.leagueoflegends.com/cdn/{latest_ver}/img/champion/{champ}.png"
+        url = f"{DDRAGON_BASE}/cdn/{latest_ver}/img/champion/{champ}.png"
         path = os.path.join(CHAMP_DIR, f"{champ}.png")
         # Special case: Fiddlesticks in DDragon is just "Fiddlesticks", but sometimes API refers differently. 
         # Usually DDragon names match the key.
-        download_file(url, path, force=force_update)
+        jobs.append((url, path, f"champions/{champ}.png"))
+    champ_stats = download_all(jobs, manifest, force_update, latest_ver, args.workers)
 
     # 4. Download Spells
     print("\n--- Syncing Spells ---")
+    jobs = []
     for spell in SPELL_IDS:
-        url = f"https://ddragon.leagueoflegends.com/cdn/{latest_ver}/img/spell/{spell}.png"
+        url = f"{DDRAGON_BASE}/cdn/{latest_ver}/img/spell/{spell}.png"
         path = os.path.join(SPELL_DIR, f"{spell}.png")
-        download_file(url, path, force=force_update)
+        jobs.append((url, path, f"spells/{spell}.png"))
+    spell_stats = download_all(jobs, manifest, force_update, latest_ver, args.workers)
+
+    if champ_stats.failed or spell_stats.failed:
+        print(f"\n[Warning] {champ_stats.failed + spell_stats.failed} files failed; re-run to retry.")
+
+    saved = champ_stats.bytes_saved + spell_stats.bytes_saved
+    unwritten = champ_stats.bytes_unwritten + spell_stats.bytes_unwritten
+    print(f"\n [i] Saved {(saved + unwritten) / 1024:.0f} KB this sync: {saved / 1024:.0f} KB not re-downloaded (304), "
+          f"{unwritten / 1024:.0f} KB of unchanged files not rewritten.")
 
     # 5. Finalize
+    save_manifest(manifest)
     save_local_version(latest_ver)
     create_placeholder()
+    build_atlas(latest_ver)
     print(f"\n[Success] All assets synced for version {latest_ver}!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -1,19 +1,33 @@
 from __future__ import annotations
+import time
+_STARTUP_T0 = time.perf_counter() # Reference point for --profile-startup
 import os
 import sys
 import json
+import math
+import heapq
+import queue
 import signal
 import ctypes
+import mmap
+import struct
+import hashlib
+import argparse
+import functools
+import itertools
 import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 import tkinter as tk
-from typing import Any, Dict, List, Optional, Tuple
-import requests
-import urllib3
-from PIL import Image, ImageTk, ImageDraw, ImageOps
-import pystray 
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 
-# Disable SSL warnings
-urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+# Heavy modules (requests/urllib3, Pillow, pystray) are imported where first needed:
+# nothing from them is required until the tray is built or a match is detected.
+if TYPE_CHECKING:
+    import requests
+    from PIL import Image, ImageTk
+
+_IMPORTS_MS = (time.perf_counter() - _STARTUP_T0) * 1000
 
 # --- SINGLE INSTANCE CHECKER (MUTEX) ---
 class SingleInstanceChecker:
@@ -31,6 +45,157 @@ class SingleInstanceChecker:
             return True
         return False
 
+# --- STARTUP PROFILER ---
+class StartupProfiler:
+    """Per-phase startup timings, printed once all milestones are reached (--profile-startup)."""
+    MILESTONES = ("tray ready", "first poll")
+
+    enabled = False
+    _phases: List[Tuple[str, float]] = []  # (phase, duration ms)
+    _marks: Dict[str, float] = {}          # milestone -> ms since main.py started
+    _lock = threading.Lock()
+
+    @staticmethod
+    def enable():
+        StartupProfiler.enabled = True
+        StartupProfiler._phases.append(("imports", _IMPORTS_MS))
+
+    @staticmethod
+    @contextmanager
+    def phase(name: str):
+        if not StartupProfiler.enabled:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            with StartupProfiler._lock:
+                StartupProfiler._phases.append((name, (time.perf_counter() - t0) * 1000))
+
+    @staticmethod
+    def mark(name: str):
+        """Records a milestone (any thread); prints the report when the last one arrives."""
+        if not StartupProfiler.enabled: return
+        with StartupProfiler._lock:
+            if name in StartupProfiler._marks: return
+            StartupProfiler._marks[name] = (time.perf_counter() - _STARTUP_T0) * 1000
+            done = all(m in StartupProfiler._marks for m in StartupProfiler.MILESTONES)
+        if done:
+            StartupProfiler.report()
+
+    @staticmethod
+    def report():
+        print("[Startup] --- profile (ms since main.py started) ---")
+        for name, ms in StartupProfiler._phases:
+            print(f"[Startup] {name:<14}{ms:>9.1f} ms")
+        for name, ms in sorted(StartupProfiler._marks.items(), key=lambda kv: kv[1]):
+            print(f"[Startup] {name:<14}@{ms:>8.1f} ms")
+        tray_ms = StartupProfiler._marks.get("tray ready")
+        if tray_ms is not None:
+            verdict = "OK" if tray_ms <= Config.STARTUP_TARGET_MS else "OVER TARGET"
+            print(f"[Startup] Tray ready in {tray_ms:.0f} ms (target {Config.STARTUP_TARGET_MS} ms): {verdict}")
+
+# --- METRICS ---
+class Metrics:
+    """Rolling hot-path timings (--metrics), logged periodically and optionally served as JSON.
+
+    Each metric keeps its last METRICS_WINDOW samples in ms; percentiles are computed
+    on demand. While disabled, timed() wrappers cost one attribute check per call.
+    """
+    enabled = False
+    _samples: Dict[str, "deque[float]"] = {}
+    _counts: Dict[str, int] = {}
+    _lock = threading.Lock()
+    _server = None
+
+    @staticmethod
+    def enable(port: Optional[int] = None):
+        Metrics.enabled = True
+        threading.Thread(target=Metrics._log_loop, name="MetricsLog", daemon=True).start()
+        if port is not None:
+            Metrics._serve(port)
+
+    @staticmethod
+    def record(name: str, ms: float):
+        with Metrics._lock:
+            window = Metrics._samples.get(name)
+            if window is None:
+                window = Metrics._samples[name] = deque(maxlen=Config.METRICS_WINDOW)
+            window.append(ms)
+            Metrics._counts[name] = Metrics._counts.get(name, 0) + 1
+
+    @staticmethod
+    def timed(name: str):
+        """Decorator: records the wrapped call's duration under `name` when enabled."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not Metrics.enabled:
+                    return fn(*args, **kwargs)
+                t0 = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    Metrics.record(name, (time.perf_counter() - t0) * 1000)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def snapshot() -> Dict[str, Dict[str, float]]:
+        with Metrics._lock:
+            windows = {name: sorted(window) for name, window in Metrics._samples.items()}
+            counts = dict(Metrics._counts)
+        stats = {}
+        for name, values in sorted(windows.items()):
+            if not values: continue
+            stats[name] = {
+                "count": counts[name],
+                "p50": values[len(values) // 2],
+                "p95": values[min(len(values) - 1, int(len(values) * 0.95))],
+                "max": values[-1],
+            }
+        return stats
+
+    @staticmethod
+    def format_line() -> str:
+        parts = [f"{name} {s['p50']:.1f}/{s['p95']:.1f}/{s['max']:.1f}" for name, s in Metrics.snapshot().items()]
+        return "p50/p95/max ms: " + (" | ".join(parts) or "no samples")
+
+    @staticmethod
+    def _log_loop():
+        while True:
+            time.sleep(Config.METRICS_LOG_INTERVAL)
+            print(f"[Metrics] {Metrics.format_line()}")
+
+    @staticmethod
+    def _serve(port: int):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") not in ("", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(Metrics.snapshot()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            # Localhost only: the endpoint is for the player's own tooling
+            Metrics._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        except OSError as e:
+            print(f"[Metrics] Could not listen on port {port}: {e}")
+            return
+        threading.Thread(target=Metrics._server.serve_forever, name="MetricsHTTP", daemon=True).start()
+        print(f"[Metrics] Serving on http://127.0.0.1:{Metrics._server.server_address[1]}/metrics")
+
 # --- RESOURCE HELPER ---
 def resource_path(relative_path):
     """Get absolute path to resource, works for dev and for PyInstaller."""
@@ -47,6 +212,10 @@ class Config:
     else:
         APP_DIR = os.path.dirname(os.path.abspath(__file__))
     CONFIG_FILE = os.path.join(APP_DIR, "config.json")
+    ICON_CACHE_DIR = os.path.join(APP_DIR, "cache", "icons")  # Resized/masked icon bitmaps
+    SPELL_DATA_CACHE = os.path.join(APP_DIR, "cache", "summoner.json") # Last good DDragon spell data
+    JOURNAL_FILE = os.path.join(APP_DIR, "cache", "timers.journal")   # Running timers, for restore after a restart
+    JOURNAL_FSYNC_INTERVAL = 0.5 # Seconds of journal writes batched into one fsync
 
     # === ITEM DATABASE (SUMMONER SPELL HASTE) ===
     # Item ID -> Haste Value
@@ -77,6 +246,11 @@ class Config:
     ICON_SIZE = 38          
     ROW_PADDING_Y = 6       
     SHOW_SEPARATOR = True   
+    RENDERER = "canvas"     # "canvas": whole panel on one Canvas (EnemyPanel); "widgets": Frame/Label/Canvas per row
+    COMPACT_ABOVE = 5       # Rosters larger than this (Arena) use the compact multi-column layout
+    COMPACT_ROWS = 5        # Max rows per column in the compact layout
+    COMPACT_ROW_PADDING_Y = 2
+    COMPACT_COLUMN_GAP = 8
     
     COLOR_BG = "#091428"        
     COLOR_BORDER = "#463714"    
@@ -89,13 +263,40 @@ class Config:
     
     FONT_FAMILY = "Arial"     
     BASE_FONT_SIZE = 12         
+    DIM_ALPHA = 180             # Darkening of an icon while its spell is on cooldown
+    GLYPH_CACHE_SIZE = 512      # Pre-rendered countdown labels kept in memory
+    ICON_CACHE_SIZE = 64        # Champion/spell icons kept in memory
     
     # API URLs
-    LCL_URL = "https://127.0.0.1:2999/liveclientdata/allgamedata"
-    DDRAGON_VER_URL = "https://ddragon.leagueoflegends.com/api/versions.json"
+    # SPELLTIMER_LCL_URL lets the app talk to simulator.py's replay server instead
+    LCL_BASE_URL = os.environ.get("SPELLTIMER_LCL_URL", "https://127.0.0.1:2999/liveclientdata").rstrip("/")
+    LCL_URL = LCL_BASE_URL + "/allgamedata"              # Full blob, fallback only
+    LCL_PLAYERLIST_URL = LCL_BASE_URL + "/playerlist"    # Teams, spells, items
+    LCL_ACTIVE_NAME_URL = LCL_BASE_URL + "/activeplayername"
+    LCL_EVENTS_URL = LCL_BASE_URL + "/eventdata"         # ?eventID=<first id wanted>
+    LCL_GAMESTATS_URL = LCL_BASE_URL + "/gamestats"      # gameTime for GameClock
     DDRAGON_DATA_URL = "https://ddragon.leagueoflegends.com/cdn/{}/data/en_US/summoner.json"
     
-    CHECK_INTERVAL = 2000 # Check every 2 seconds
+    # === POLLING (ms) ===
+    POLL_INTERVAL_IN_GAME = 1000    # Match running: catch item purchases quickly
+    POLL_INTERVAL_LOADING = 2000    # Loading screen: API is up, roster not ready yet
+    POLL_BACKOFF_MIN = 2000         # No client: first retry delay...
+    POLL_BACKOFF_MAX = 30000        # ...doubled on every miss up to this cap
+    QUEUE_CHECK_INTERVAL = 100 # How often the UI drains poller results (ms)
+
+    STARTUP_TARGET_MS = 500 # Time-to-tray-icon budget checked by --profile-startup
+
+    # === METRICS (--metrics) ===
+    METRICS_WINDOW = 600         # Samples kept per metric for p50/p95/max
+    METRICS_LOG_INTERVAL = 60    # Seconds between [Metrics] log lines
+    METRICS_PORT = 2998          # Default localhost port for --metrics-port
+
+    # === LAN SYNC (--sync-serve / --sync-join) ===
+    SYNC_PORT = 2997
+    SYNC_RECONNECT_DELAY = 2.0   # Seconds between client reconnect attempts
+    SYNC_MAX_BUFFER = 64 * 1024  # Bytes queued for one subscriber before it's dropped as too slow
+    SYNC_MAX_LINE = 256 * 1024   # Longest JSON line accepted; a longer one drops the connection
+    SYNC_MAX_TIMERS = 64         # Spells the hub tracks per match (Arena: 16 players x 2 spells)
 
 # --- WIN32 API ---
 class Win32Utils:
@@ -117,53 +318,280 @@ class Win32Utils:
 
 # --- DDRAGON MANAGER ---
 class DDragonManager:
+    """Keeps Config.SPELL_TIMERS in sync with DDragon's summoner.json.
+
+    The last good file is cached on disk and applied synchronously at startup;
+    the network check runs on a background thread.
+    """
+    cached_version: Optional[str] = None
+
+    @staticmethod
+    def load_cached() -> bool:
+        """Applies the cached summoner.json, if any. No network access."""
+        try:
+            with open(Config.SPELL_DATA_CACHE, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        DDragonManager._apply(cached.get("data", {}))
+        DDragonManager.cached_version = cached.get("version")
+        print(f"[DDragon] Loaded cached spell data ({DDragonManager.cached_version})")
+        return True
+
+    @staticmethod
+    def start_background_update():
+        threading.Thread(target=DDragonManager.update_timers, name="DDragonUpdate", daemon=True).start()
+
     @staticmethod
     def update_timers():
+        # Shares the version check with the asset downloader
+        import requests
+        from download_assets import get_latest_version
+
         print("[DDragon] Checking for updates...")
         try:
-            v_resp = requests.get(Config.DDRAGON_VER_URL, timeout=2)
-            if v_resp.status_code != 200: return
-            version = v_resp.json()[0]
+            version = get_latest_version(timeout=2)
+            if not version: return
+            if version == DDragonManager.cached_version:
+                print(f"[DDragon] Spell data is up to date ({version})")
+                return
 
             url = Config.DDRAGON_DATA_URL.format(version)
             d_resp = requests.get(url, timeout=3)
             if d_resp.status_code != 200: return
             
             data = d_resp.json().get("data", {})
-            for spell_id, info in data.items():
-                cooldowns = info.get("cooldown", [300])
-                cd = int(cooldowns[0])
-                key = spell_id.lower()
-                Config.SPELL_TIMERS[key] = cd
+            DDragonManager._apply(data)
+            DDragonManager._save_cache(version, data)
+            DDragonManager.cached_version = version
+            print(f"[DDragon] Spell data updated to {version}")
         except Exception as e:
             print(f"[DDragon] Update failed: {e}")
 
+    @staticmethod
+    def _apply(data: Dict):
+        timers = dict(Config.SPELL_TIMERS)
+        for spell_id, info in data.items():
+            cooldowns = info.get("cooldown", [300])
+            cd = int(cooldowns[0])
+            key = spell_id.lower()
+            timers[key] = cd
+        # Rebind in one step so the UI thread never sees a half-updated table
+        Config.SPELL_TIMERS = timers
+        SpellResolver.rebuild(data)
+
+    @staticmethod
+    def _save_cache(version: str, data: Dict):
+        tmp_path = Config.SPELL_DATA_CACHE + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(Config.SPELL_DATA_CACHE), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": version, "data": data}, f)
+            os.replace(tmp_path, Config.SPELL_DATA_CACHE)
+        except OSError as e:
+            print(f"[DDragon] Cache write failed: {e}")
+
+# --- SPELL NAME RESOLVER ---
+class SpellResolver:
+    """Maps Live Client spell names to canonical DDragon ids (e.g. "SummonerFlash").
+
+    The index is built from summoner.json (id, key, English name and the
+    GeneratedTip_SummonerSpell_<id>_DisplayName form) plus ALIASES, and every
+    resolved string is memoized, so a lookup is normally one dict hit.
+    """
+    # Lowercase name -> canonical id, for names DDragon data does not cover. Applied over
+    # the DDragon entries, so an aliased id (e.g. S12_SummonerTeleportUpgrade) and every
+    # name pointing at it resolve to the alias target, which has an icon.
+    ALIASES = {
+        "flash": "SummonerFlash",
+        "teleport": "SummonerTeleport",
+        "summonerteleportupgrade": "SummonerTeleport", # Unleashed Teleport
+        "smite": "SummonerSmite",
+        "ignite": "SummonerDot",
+        "barrier": "SummonerBarrier",
+        "heal": "SummonerHeal",
+        "exhaust": "SummonerExhaust",
+        "cleanse": "SummonerBoost",
+        "ghost": "SummonerHaste",
+        "clarity": "SummonerMana",
+        "mark": "SummonerSnowball",
+    }
+
+    _index: Dict[str, str] = {}
+    _memo: Dict[str, str] = {}
+
+    @staticmethod
+    def rebuild(data: Optional[Dict] = None):
+        """Rebuilds the index from summoner.json's "data" dict (aliases only if None)."""
+        aliases = SpellResolver.ALIASES
+        index = {}
+        for spell_id, info in (data or {}).items():
+            canonical = info.get("id", spell_id)
+            # "S12_SummonerTeleportUpgrade" is aliased by its last part
+            canonical = aliases.get(canonical.lower()) or aliases.get(canonical.lower().split("_")[-1]) or canonical
+            for name in (spell_id, info.get("key"), info.get("name")):
+                if name: index[str(name).lower()] = canonical
+            index[f"generatedtip_summonerspell_{spell_id.lower()}_displayname"] = canonical
+        index.update(aliases)
+        for canonical in aliases.values():
+            index[canonical.lower()] = canonical
+        # Swap both tables at once; the poller thread may be resolving concurrently
+        SpellResolver._index, SpellResolver._memo = index, {}
+
+    @staticmethod
+    def resolve(raw: Optional[str]) -> str:
+        if not raw: return "Unknown"
+        memo = SpellResolver._memo
+        hit = memo.get(raw)
+        if hit is None:
+            hit = SpellResolver._lookup(raw)
+            memo[raw] = hit
+        return hit
+
+    @staticmethod
+    def _lookup(raw: str) -> str:
+        if not SpellResolver._index:
+            SpellResolver.rebuild()
+        index = SpellResolver._index
+        raw_lower = raw.lower()
+        hit = index.get(raw_lower)
+        if hit: return hit
+
+        # GeneratedTip_SummonerSpell_<...>_DisplayName with an id we don't know verbatim
+        parts = raw_lower.split("_")
+        for part in reversed(parts):
+            hit = index.get(part)
+            if hit: return hit
+
+        # Last resort: substring match on known names (new/localized variants)
+        for name, canonical in SpellResolver.ALIASES.items():
+            if name in raw_lower: return canonical
+        for part in reversed(raw.split("_")):
+            if part.startswith("Summoner") and part != "SummonerSpell": return part
+        return "Unknown"
+
 # --- DATA MANAGER ---
 class GameDataManager:
+    _session: Optional[requests.Session] = None
+
     @staticmethod
-    def fetch_data() -> Optional[Dict]:
+    def _get_session() -> requests.Session:
+        # One keep-alive connection to the local client instead of a new TLS handshake per poll
+        if GameDataManager._session is None:
+            import requests
+            import urllib3
+            # The Live Client uses a self-signed certificate
+            urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            session = requests.Session()
+            session.verify = False
+            # Local-only traffic: env proxies/CA bundles (REQUESTS_CA_BUNDLE) would override verify=False
+            session.trust_env = False
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1)
+            session.mount("https://", adapter)
+            GameDataManager._session = session
+        return GameDataManager._session
+
+    _active_name: Optional[str] = None
+
+    @staticmethod
+    def _get_json(url: str) -> Tuple[int, Any]:
+        """GET a Live Client endpoint. Raises requests.RequestException if the client is down."""
+        resp = GameDataManager._get_session().get(url, timeout=0.5)
+        if resp.status_code != 200:
+            return resp.status_code, None
         try:
-            resp = requests.get(Config.LCL_URL, verify=False, timeout=0.5)
-            if resp.status_code == 200:
-                return resp.json()
-        except:
-            pass
-        return None
+            return 200, GameDataManager._decode(resp)
+        except ValueError:
+            return resp.status_code, None
+
+    @staticmethod
+    @Metrics.timed("json_decode")
+    def _decode(resp: requests.Response) -> Any:
+        return resp.json()
+
+    @staticmethod
+    @Metrics.timed("poll")
+    def poll() -> Tuple[str, Optional[Dict]]:
+        """Fetches game data and classifies the client state (see PollScheduler).
+
+        Uses the small /playerlist endpoint and learns the local player's name once
+        per match; /allgamedata is only requested when that is not possible.
+        Returned data always has the allgamedata shape expected by parse_enemies.
+        """
+        import requests
+        try:
+            status, players = GameDataManager._get_json(Config.LCL_PLAYERLIST_URL)
+            if status != 200:
+                # 404 / RPC errors while the loading screen is up
+                return PollScheduler.LOADING, None
+            if not players:
+                return PollScheduler.LOADING, None
+
+            if GameDataManager._active_name is None:
+                status, name = GameDataManager._get_json(Config.LCL_ACTIVE_NAME_URL)
+                if status != 200 or not name:
+                    # Spectator / unknown player: let allgamedata decide
+                    return GameDataManager._poll_allgamedata()
+                GameDataManager._active_name = name
+        except requests.RequestException:
+            GameDataManager._active_name = None
+            return PollScheduler.NO_CLIENT, None
+
+        data = {"allPlayers": players, "activePlayer": {"riotId": GameDataManager._active_name}}
+        return PollScheduler.IN_GAME, data
+
+    @staticmethod
+    def _poll_allgamedata() -> Tuple[str, Optional[Dict]]:
+        status, data = GameDataManager._get_json(Config.LCL_URL)
+        if status != 200 or not data or not data.get("allPlayers"):
+            return PollScheduler.LOADING, None
+        return PollScheduler.IN_GAME, data
+
+    @staticmethod
+    def match_id(data: Dict) -> str:
+        """Id for the match in progress: the same players on the same teams, across restarts.
+
+        GameDataPoller computes it once per game, so later roster changes keep the id.
+        """
+        players = sorted((p.get("team", ""), p.get("riotId") or p.get("summonerName", ""))
+                         for p in data.get("allPlayers") or [])
+        return hashlib.sha1(json.dumps(players).encode()).hexdigest()[:16]
 
     @staticmethod
+    def fetch_game_time(data: Optional[Dict]) -> Optional[float]:
+        """Current gameData.gameTime: from the allgamedata fallback if that's what we have, else /gamestats."""
+        import requests
+        game_data = (data or {}).get("gameData")
+        if game_data is None:
+            try:
+                status, game_data = GameDataManager._get_json(Config.LCL_GAMESTATS_URL)
+            except requests.RequestException:
+                return None
+            if status != 200 or not game_data:
+                return None
+        game_time = game_data.get("gameTime")
+        return float(game_time) if game_time is not None else None
+
+    @staticmethod
+    def fetch_data() -> Optional[Dict]:
+        _, data = GameDataManager.poll()
+        return data
+
+    @staticmethod
+    @Metrics.timed("parse_enemies")
     def parse_enemies(data: Dict) -> List[Dict]:
         if not data: return GameDataManager._get_dummy_data()
         
         all_players = data.get("allPlayers") or []
         active_data = data.get("activePlayer", {})
-        my_name = active_data.get("summonerName")
+        my_name = active_data.get("riotId") or active_data.get("summonerName")
         
         # --- FIX: Reliable Team Detection ---
         # Look up the player in the full list to get the correct team (ORDER/CHAOS)
         my_team = None
         if my_name:
             for p in all_players:
-                if p.get("summonerName") == my_name:
+                if my_name in (p.get("riotId"), p.get("summonerName")):
                     my_team = p.get("team")
                     break
         
@@ -192,6 +620,7 @@ class GameDataManager:
             
             enemies.append({
                 "champ": champ_name,
+                "team": p.get("team", ""),
                 "spell1": GameDataManager._clean_spell_name(spells.get("summonerSpellOne", {}).get("rawDisplayName")),
                 "spell2": GameDataManager._clean_spell_name(spells.get("summonerSpellTwo", {}).get("rawDisplayName")),
                 "haste": current_haste 
@@ -200,21 +629,7 @@ class GameDataManager:
 
     @staticmethod
     def _clean_spell_name(raw: Optional[str]) -> str:
-        if not raw: return "Unknown"
-        raw_lower = raw.lower()
-        if "teleport" in raw_lower: return "SummonerTeleport"
-        if "smite" in raw_lower: return "SummonerSmite"
-        if "flash" in raw_lower: return "SummonerFlash"
-        if "ignite" in raw_lower or "dot" in raw_lower: return "SummonerDot"
-        if "barrier" in raw_lower: return "SummonerBarrier"
-        if "heal" in raw_lower: return "SummonerHeal"
-        if "exhaust" in raw_lower: return "SummonerExhaust"
-        if "cleanse" in raw_lower or "boost" in raw_lower: return "SummonerBoost"
-        if "ghost" in raw_lower or "haste" in raw_lower: return "SummonerHaste"
-        parts = raw.split("_")
-        for p in reversed(parts):
-            if p.startswith("Summoner") and p != "SummonerSpell": return p
-        return "Unknown"
+        return SpellResolver.resolve(raw)
 
     @staticmethod
     def _get_dummy_data():
@@ -223,19 +638,270 @@ class GameDataManager:
             {"champ": "Ornn", "spell1": "SummonerFlash", "spell2": "SummonerTeleport", "haste": 20},
         ]
 
+# --- EVENT STREAM ---
+class GameEvent(NamedTuple):
+    event_id: int
+    name: str       # EventName, e.g. "GameStart", "ChampionKill", "GameEnd"
+    time: float     # Game time in seconds
+    data: Dict      # Raw event payload
+
+class EventStream:
+    """Incremental consumer of /eventdata.
+
+    fetch_new() runs on the poller thread and only returns events past the EventID
+    cursor. subscribe()/dispatch() are used from the Tk thread.
+    """
+    GAME_START = "GameStart"
+    GAME_END = "GameEnd"
+    CHAMPION_KILL = "ChampionKill"
+    ALL = "*"
+
+    def __init__(self):
+        self.next_id = 0
+        self._subscribers: Dict[str, List[Callable[[GameEvent], None]]] = {}
+
+    def reset(self):
+        self.next_id = 0
+
+    def fetch_new(self) -> List[GameEvent]:
+        """Returns events not seen yet. Raises requests.RequestException if the client is down."""
+        status, payload = GameDataManager._get_json(f"{Config.LCL_EVENTS_URL}?eventID={self.next_id}")
+        if status != 200 or not payload:
+            return []
+        events = []
+        for raw in payload.get("Events", []):
+            event_id = raw.get("EventID", -1)
+            # Older clients ignore ?eventID and send the whole list
+            if event_id < self.next_id: continue
+            events.append(GameEvent(event_id, raw.get("EventName", ""), raw.get("EventTime", 0.0), raw))
+            self.next_id = event_id + 1
+        return events
+
+    def subscribe(self, name: str, callback: Callable[[GameEvent], None]):
+        """Registers a callback for an EventName, or EventStream.ALL for every event."""
+        self._subscribers.setdefault(name, []).append(callback)
+
+    def dispatch(self, event: GameEvent):
+        for callback in self._subscribers.get(event.name, []) + self._subscribers.get(EventStream.ALL, []):
+            callback(event)
+
+# --- CHANGE DETECTION ---
+class RosterDiffer:
+    """Skips parse_enemies when the roster slice of a poll is unchanged.
+
+    Only the fields parse_enemies reads (team, champion, spells, item IDs) are hashed,
+    so changes in scores or levels don't trigger a re-parse.
+    """
+    def __init__(self):
+        self.polls_skipped = 0
+        self.polls_processed = 0
+        self._last_hash: Optional[int] = None
+        self._last_haste: Dict[str, int] = {}
+
+    @staticmethod
+    def _roster_hash(data: Dict) -> int:
+        active = data.get("activePlayer", {})
+        players = []
+        for p in data.get("allPlayers") or []:
+            spells = p.get("summonerSpells", {})
+            players.append((
+                p.get("riotId"), p.get("summonerName"), p.get("team"),
+                p.get("rawChampionName"), p.get("championName"),
+                spells.get("summonerSpellOne", {}).get("rawDisplayName"),
+                spells.get("summonerSpellTwo", {}).get("rawDisplayName"),
+                tuple(item.get("itemID", 0) for item in p.get("items", [])),
+            ))
+        return hash((active.get("riotId"), active.get("summonerName"), active.get("team"), tuple(players)))
+
+    def update(self, data: Dict) -> Optional[Tuple[List[Dict], List[Tuple[str, int, int]]]]:
+        """Returns (enemies, haste deltas) if the roster changed, None otherwise.
+
+        Deltas are (champ, old haste, new haste) for champions already known.
+        """
+        roster_hash = RosterDiffer._roster_hash(data)
+        if roster_hash == self._last_hash:
+            self.polls_skipped += 1
+            return None
+        self._last_hash = roster_hash
+        self.polls_processed += 1
+
+        enemies = GameDataManager.parse_enemies(data)
+        deltas = []
+        for enemy in enemies:
+            old = self._last_haste.get(enemy['champ'])
+            if old is not None and old != enemy['haste']:
+                deltas.append((enemy['champ'], old, enemy['haste']))
+        self._last_haste = {e['champ']: e['haste'] for e in enemies}
+        return enemies, deltas
+
+    def reset(self):
+        if self.polls_processed:
+            print(f"[Poller] Roster polls: {self.polls_processed} processed, {self.polls_skipped} skipped (unchanged)")
+        self.polls_skipped = 0
+        self.polls_processed = 0
+        self._last_hash = None
+        self._last_haste = {}
+
+# --- POLL SCHEDULER ---
+class PollScheduler:
+    """Picks the next poll delay from the last observed client state."""
+    NO_CLIENT = "no_client"   # Connection refused: back off exponentially
+    LOADING = "loading"       # API answers but the match has not started
+    IN_GAME = "in_game"       # allPlayers populated
+
+    def __init__(self):
+        self.state = PollScheduler.NO_CLIENT
+        self._backoff = Config.POLL_BACKOFF_MIN
+
+    def next_interval(self, state: str) -> int:
+        """Returns the delay (ms) before the next poll and logs state/interval changes."""
+        if state == PollScheduler.NO_CLIENT:
+            interval = self._backoff
+            self._backoff = min(self._backoff * 2, Config.POLL_BACKOFF_MAX)
+        else:
+            self._backoff = Config.POLL_BACKOFF_MIN
+            if state == PollScheduler.IN_GAME:
+                interval = Config.POLL_INTERVAL_IN_GAME
+            else:
+                interval = Config.POLL_INTERVAL_LOADING
+
+        if state != self.state:
+            print(f"[Poller] {self.state} -> {state} (polling every {interval} ms)")
+            self.state = state
+        elif state == PollScheduler.NO_CLIENT and interval < Config.POLL_BACKOFF_MAX:
+            print(f"[Poller] No client, backing off to {interval} ms")
+        return interval
+
+# --- BACKGROUND POLLER ---
+class GameDataPoller(threading.Thread):
+    """Polls the Live Client API off the Tk thread and queues parsed results.
+
+    Messages are (kind, payload) tuples:
+      ("event", GameEvent)   - new entry from /eventdata (see EventStream)
+      ("roster", List[Dict]) - parsed enemies, only sent when the roster changed, and
+                               never before the match's first "clock" (no timers on an unsynced clock)
+      ("haste", List[Tuple]) - (champ, old, new) haste changes of known enemies
+      ("clock", (game_time, monotonic)) - gameData.gameTime and when it was read (see GameClock)
+      ("match", str)         - GameDataManager.match_id, sent before every roster; taken from the
+                               game's first roster and kept until the game changes, so a
+                               mid-game swap or late player entry doesn't look like a new match
+      ("no_game", None)      - client not reachable / no match / match over
+    """
+    def __init__(self, out_queue: "queue.Queue[Tuple[str, Any]]"):
+        super().__init__(name="LiveClientPoller", daemon=True)
+        self.out_queue = out_queue
+        self.scheduler = PollScheduler()
+        self.events = EventStream()
+        self.differ = RosterDiffer()
+        self._game_ended = False
+        self._clock_sent = False # A game time reached the clock this match; the roster waits for it
+        self._match: Optional[str] = None
+        self._game_time = 0.0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            state, data = GameDataManager.poll()
+            StartupProfiler.mark("first poll")
+            if state == PollScheduler.IN_GAME:
+                self._poll_events()
+            else:
+                # Next match starts with a fresh EventID sequence
+                self.events.reset()
+                self._game_ended = False
+                self._clock_sent = False
+                self._match = None
+                self._game_time = 0.0
+
+            if state == PollScheduler.IN_GAME and not self._game_ended:
+                game_time = GameDataManager.fetch_game_time(data)
+                if game_time is not None:
+                    if game_time < self._game_time - 1:
+                        # Clock went backwards without a gap in polling: a new game, re-send its roster
+                        self._match = None
+                        self.differ.reset()
+                    self._game_time = game_time
+                    self.out_queue.put(("clock", (game_time, time.monotonic())))
+                    self._clock_sent = True
+                # Until the clock is anchored, deadlines would be on time.monotonic()'s scale:
+                # hold the roster (and the overlay) back until a poll returns a game time
+                changes = self.differ.update(data) if self._clock_sent else None
+                if changes:
+                    enemies, deltas = changes
+                    if self._match is None:
+                        self._match = GameDataManager.match_id(data)
+                    self.out_queue.put(("match", self._match))
+                    self.out_queue.put(("roster", enemies))
+                    if deltas:
+                        self.out_queue.put(("haste", deltas))
+            else:
+                self.differ.reset()
+                self.out_queue.put(("no_game", None))
+            self._stop_event.wait(self.scheduler.next_interval(state) / 1000)
+
+    def _poll_events(self):
+        import requests
+        try:
+            new_events = self.events.fetch_new()
+        except requests.RequestException:
+            return
+        for event in new_events:
+            if event.name == EventStream.GAME_END:
+                # The API stays up on the end screen; stop reporting the roster
+                self._game_ended = True
+            self.out_queue.put(("event", event))
+
+    def stop(self):
+        self._stop_event.set()
+
 # --- ASSET MANAGER ---
 class AssetManager:
+    _icon_cache: "OrderedDict[Tuple, ImageTk.PhotoImage]" = OrderedDict()
+    _assets_version: Optional[str] = None
+    _atlas: Optional[Tuple[memoryview, Dict[str, List[int]], str]] = None
+    _atlas_loaded = False
+
+    ATLAS_MAGIC = b"SPTATLS1" # Must match download_assets.py
+
     @staticmethod
     def load_icon(folder: str, name: str, size: Tuple[int, int], is_round: bool = False) -> ImageTk.PhotoImage:
-        path = resource_path(os.path.join("assets", folder, name + ".png"))
-        try:
-            img = Image.open(path).convert("RGBA")
-        except FileNotFoundError:
-            img = Image.new("RGBA", size, "#222")
-            draw = ImageDraw.Draw(img)
-            draw.rectangle([0,0, size[0]-1, size[1]-1], outline="#555")
-            text = name[:2] if name else "??"
-            draw.text((size[0]//2, size[1]//2), text, fill="#888", anchor="mm")
+        """Returns a ready-to-draw icon: memory LRU -> disk cache -> PNG decode + resize."""
+        from PIL import ImageTk
+        key = (folder, name, size, is_round, AssetManager._get_assets_version())
+        cache = AssetManager._icon_cache
+        icon = cache.get(key)
+        if icon is not None:
+            cache.move_to_end(key)
+            return icon
+
+        img = AssetManager._load_cached_bitmap(key)
+        if img is None:
+            img, found = AssetManager._render_icon(folder, name, size, is_round)
+            if found: # Never persist placeholders, the real art may be downloaded later
+                AssetManager._store_cached_bitmap(key, img)
+
+        icon = ImageTk.PhotoImage(img)
+        cache[key] = icon
+        if len(cache) > Config.ICON_CACHE_SIZE:
+            cache.popitem(last=False)
+        return icon
+
+    @staticmethod
+    def _render_icon(folder: str, name: str, size: Tuple[int, int], is_round: bool) -> Tuple[Image.Image, bool]:
+        from PIL import Image, ImageDraw, ImageOps
+        found = True
+        img = AssetManager._load_from_atlas(folder, name)
+        if img is None:
+            path = resource_path(os.path.join("assets", folder, name + ".png"))
+            try:
+                img = Image.open(path).convert("RGBA")
+            except FileNotFoundError:
+                found = False
+                img = Image.new("RGBA", size, "#222")
+                draw = ImageDraw.Draw(img)
+                draw.rectangle([0,0, size[0]-1, size[1]-1], outline="#555")
+                text = name[:2] if name else "??"
+                draw.text((size[0]//2, size[1]//2), text, fill="#888", anchor="mm")
 
         img = img.resize(size, Image.Resampling.LANCZOS)
         if is_round:
@@ -244,99 +910,1128 @@ class AssetManager:
             draw.ellipse((0, 0) + size, fill=255)
             img = ImageOps.fit(img, mask.size, centering=(0.5, 0.5))
             img.putalpha(mask)
-        return ImageTk.PhotoImage(img)
+        return img, found
+
+    @staticmethod
+    def _get_atlas() -> Optional[Tuple[memoryview, Dict[str, List[int]], str]]:
+        """Maps assets/icons.atlas (built by download_assets.py) once; None if absent/invalid."""
+        if AssetManager._atlas_loaded:
+            return AssetManager._atlas
+        AssetManager._atlas_loaded = True
+        try:
+            with open(resource_path(os.path.join("assets", "icons.atlas")), "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        magic_len = len(AssetManager.ATLAS_MAGIC)
+        try:
+            if mm[:magic_len] != AssetManager.ATLAS_MAGIC:
+                raise ValueError("bad magic")
+            (index_len,) = struct.unpack_from("<I", mm, magic_len)
+            index_start = magic_len + 4
+            index = json.loads(mm[index_start:index_start + index_len].decode("utf-8"))
+        except (ValueError, struct.error) as e:
+            print(f"[Assets] Ignoring invalid icon atlas: {e}")
+            mm.close()
+            return None
+
+        # Pixel data is sliced straight out of the mapping; the view keeps it open
+        pixels = memoryview(mm)[index_start + index_len:]
+        AssetManager._atlas = (pixels, index.get("icons", {}), index.get("version", "unknown"))
+        return AssetManager._atlas
+
+    @staticmethod
+    def _load_from_atlas(folder: str, name: str) -> Optional[Image.Image]:
+        atlas = AssetManager._get_atlas()
+        if atlas is None: return None
+        pixels, icons, _ = atlas
+        entry = icons.get(f"{folder}/{name}")
+        if entry is None: return None
+        from PIL import Image
+        offset, width, height = entry
+        data = pixels[offset:offset + width * height * 4]
+        return Image.frombuffer("RGBA", (width, height), data, "raw", "RGBA", 0, 1)
+
+    @staticmethod
+    def _get_assets_version() -> str:
+        """DDragon version of the bundled assets (atlas index, else download_assets.py's version.txt)."""
+        if AssetManager._assets_version is None:
+            atlas = AssetManager._get_atlas()
+            if atlas is not None:
+                AssetManager._assets_version = atlas[2]
+            else:
+                try:
+                    with open(resource_path(os.path.join("assets", "version.txt")), "r") as f:
+                        AssetManager._assets_version = f.read().strip() or "unknown"
+                except OSError:
+                    AssetManager._assets_version = "unknown"
+        return AssetManager._assets_version
+
+    @staticmethod
+    def _cached_bitmap_path(key: Tuple) -> str:
+        folder, name, size, is_round, version = key
+        shape = "round" if is_round else "square"
+        filename = f"{folder}-{name}-{size[0]}x{size[1]}-{shape}.rgba"
+        return os.path.join(Config.ICON_CACHE_DIR, version, filename)
+
+    @staticmethod
+    def _load_cached_bitmap(key: Tuple) -> Optional[Image.Image]:
+        # Raw RGBA bytes: no PNG decode, resize or masking on a hit
+        from PIL import Image
+        size = key[2]
+        try:
+            with open(AssetManager._cached_bitmap_path(key), "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) != size[0] * size[1] * 4:
+            return None
+        return Image.frombuffer("RGBA", size, data, "raw", "RGBA", 0, 1)
+
+    @staticmethod
+    def _store_cached_bitmap(key: Tuple, img: Image.Image):
+        path = AssetManager._cached_bitmap_path(key)
+        tmp_path = path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(img.tobytes())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"[Assets] Icon cache write failed: {e}")
+
+    # --- Countdown glyphs ---
+    # Dim layer + outlined label rendered once per string, then reused by every widget.
+    _glyph_cache: "OrderedDict[str, ImageTk.PhotoImage]" = OrderedDict()
+    _glyph_signature: Optional[Tuple] = None
+    _glyph_fonts: Dict[int, Any] = {}
+
+    @staticmethod
+    def load_countdown_glyph(text: str) -> ImageTk.PhotoImage:
+        """Returns the pre-rendered overlay image for a countdown label (LRU cached)."""
+        from PIL import ImageTk
+        signature = (Config.ICON_SIZE, Config.FONT_FAMILY, Config.BASE_FONT_SIZE, Config.DIM_ALPHA,
+                     Config.COLOR_TEXT_ACTIVE, Config.COLOR_TEXT_OUTLINE)
+        cache = AssetManager._glyph_cache
+        if signature != AssetManager._glyph_signature:
+            # Visual config changed: every cached glyph is stale
+            cache.clear()
+            AssetManager._glyph_fonts.clear()
+            AssetManager._glyph_signature = signature
+
+        glyph = cache.get(text)
+        if glyph is not None:
+            cache.move_to_end(text)
+            return glyph
+
+        glyph = ImageTk.PhotoImage(AssetManager._render_countdown(text))
+        cache[text] = glyph
+        if len(cache) > Config.GLYPH_CACHE_SIZE:
+            cache.popitem(last=False)
+        return glyph
+
+    @staticmethod
+    def _render_countdown(text: str) -> Image.Image:
+        from PIL import Image, ImageDraw
+        size = Config.ICON_SIZE
+        img = Image.new("RGBA", (size, size), (0, 0, 0, Config.DIM_ALPHA))
+        draw = ImageDraw.Draw(img)
+        font = AssetManager._get_glyph_font(SpellTimer._get_adaptive_font(text)[1])
+        draw.text((size / 2, size / 2), text, font=font, anchor="mm", fill=Config.COLOR_TEXT_ACTIVE,
+                  stroke_width=1, stroke_fill=Config.COLOR_TEXT_OUTLINE)
+        return img
 
     @staticmethod
-    def create_dim_layer(size: Tuple[int, int]) -> ImageTk.PhotoImage:
-        img = Image.new("RGBA", size, (0, 0, 0, 180)) 
-        return ImageTk.PhotoImage(img)
+    def _get_glyph_font(point_size: int):
+        font = AssetManager._glyph_fonts.get(point_size)
+        if font: return font
+        from PIL import ImageFont
+        px = round(point_size * 96 / 72) # Tk sizes are points, Pillow wants pixels
+        family = Config.FONT_FAMILY.lower().replace(" ", "")
+        for candidate in (f"{family}bd.ttf", f"{family}.ttf", "DejaVuSans-Bold.ttf"):
+            try:
+                font = ImageFont.truetype(candidate, px)
+                break
+            except OSError:
+                continue
+        else:
+            font = ImageFont.load_default(px)
+        AssetManager._glyph_fonts[point_size] = font
+        return font
+
+# --- TIMER SCHEDULER ---
+class GameClock:
+    """In-game time: gameData.gameTime from the last poll, interpolated with the wall clock.
+
+    Every sync snaps back to the game's own clock, so stalls and alt-tabs can't
+    make timers drift, and a game time that stops advancing between polls
+    (pause) freezes the clock until it moves again. Before the first sync it
+    runs on time.monotonic().
+    """
+    PAUSE_MIN_ELAPSED = 0.5   # Wall seconds between syncs before a stopped game time means "paused"
+    PAUSE_MAX_ELAPSED = 10.0  # Longer gaps are a reconnect / new match, not a pause
+    PAUSE_SYNCS = 2           # Consecutive stopped syncs before pausing (one can be poll jitter)
+    SNAP_TOLERANCE = 0.05     # Corrections smaller than this don't need a re-render
+
+    def __init__(self):
+        self._anchor: Optional[Tuple[float, float]] = None # (game time, monotonic when read)
+        self.paused = False
+        self._stalls = 0
+
+    def now(self) -> float:
+        if self._anchor is None:
+            return time.monotonic()
+        game_time, wall = self._anchor
+        if self.paused:
+            return game_time
+        return game_time + (time.monotonic() - wall)
+
+    def sync(self, game_time: float, wall: float) -> bool:
+        """Re-anchors on a polled game time. Returns True if displayed timers need refreshing."""
+        was_paused = self.paused
+        if self._anchor is None:
+            drift = float("inf")
+        else:
+            prev_time, prev_wall = self._anchor
+            elapsed = wall - prev_wall
+            advanced = game_time - prev_time
+            stalled = self.PAUSE_MIN_ELAPSED <= elapsed <= self.PAUSE_MAX_ELAPSED and 0 <= advanced < elapsed * 0.1
+            self._stalls = self._stalls + 1 if stalled else 0
+            self.paused = self._stalls >= self.PAUSE_SYNCS
+            predicted = prev_time if was_paused else prev_time + elapsed
+            drift = game_time - predicted
+        self._anchor = (game_time, wall)
+        if self.paused != was_paused:
+            print(f"[Clock] Game {'paused' if self.paused else 'resumed'} at {game_time:.0f}s")
+        return self.paused != was_paused or abs(drift) >= self.SNAP_TOLERANCE
+
+class TimerScheduler:
+    """Drives every running spell timer from a single Tk `after` chain.
+
+    Deadlines are absolute GameClock times kept in a heap, so neither a late
+    wakeup nor a stall shifts when a timer ends, and a paused game pauses them.
+    Each wakeup is aligned to the next whole-second boundary of the soonest
+    timer and renders every active widget from its own deadline.
+    """
+    def __init__(self, root: tk.Misc, clock: Optional[GameClock] = None):
+        self.root = root
+        self.clock = clock or GameClock()
+        self._heap: List[Tuple[float, int, Any]] = []  # (deadline, seq, widget)
+        self._active: Dict[Any, Tuple[float, int]] = {} # widget -> (deadline, seq) of its live entry
+        self._seq = itertools.count()
+        self._job: Optional[str] = None
+        self._due: Optional[float] = None # When the pending after() should fire, for lateness metrics
+
+    def schedule(self, widget, deadline: float):
+        """Runs `widget` until `deadline` (GameClock time, see TimerEngine.start)."""
+        seq = next(self._seq)
+        self._active[widget] = (deadline, seq)
+        heapq.heappush(self._heap, (deadline, seq, widget))
+        self._wake_now()
+
+    def cancel(self, widget):
+        # O(1): the stale heap entry is discarded when it reaches the top
+        self._active.pop(widget, None)
+
+    def clear(self):
+        self._active.clear()
+        self._heap.clear()
+        if self._job:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def refresh(self):
+        """Re-renders and re-plans now, e.g. after the clock snapped or paused."""
+        if self._active: self._wake_now()
+
+    def _wake_now(self):
+        if self._job:
+            self.root.after_cancel(self._job)
+        self._job = self.root.after_idle(self._tick)
+        self._due = time.monotonic()
+
+    @Metrics.timed("timer_tick")
+    def _tick(self):
+        self._job = None
+        wall = time.monotonic()
+        if Metrics.enabled and self._due is not None:
+            Metrics.record("timer_lateness", max(0.0, wall - self._due) * 1000)
+        self._due = None
+        now = self.clock.now()
+
+        # 1. Expire finished timers and drop cancelled entries
+        while self._heap:
+            deadline, seq, widget = self._heap[0]
+            if self._active.get(widget, (None, None))[1] != seq:
+                heapq.heappop(self._heap)
+            elif deadline <= now:
+                heapq.heappop(self._heap)
+                del self._active[widget]
+                widget._tick(0)
+            else:
+                break
+
+        # 2. Render every running timer from its deadline
+        for widget, (deadline, _) in list(self._active.items()):
+            widget._tick(math.ceil(deadline - now))
+
+        # 3. Sleep until the soonest timer's display changes (while paused, until the clock resumes)
+        if self._heap and not self.clock.paused:
+            left = self._heap[0][0] - now
+            delay = left - math.floor(left) or 1.0
+            self._job = self.root.after(int(delay * 1000) + 1, self._tick)
+            self._due = wall + delay + 0.001
 
 # --- SPELL TIMER WIDGET ---
-class SpellTimerWidget(tk.Canvas):
-    def __init__(self, parent, champ_name: str, spell_name: str, app_ref):
-        super().__init__(parent, width=Config.ICON_SIZE, height=Config.ICON_SIZE, 
-                         bg=Config.COLOR_BG, highlightthickness=0)
+class SpellTimer:
+    """Cooldown state and drawing for one enemy spell, on whichever canvas holds its items.
+
+    Shared by SpellTimerWidget (one Canvas per spell) and SpellSlot (an area of EnemyPanel).
+    """
+    _font_cache: Dict[Tuple[int, str, int], Tuple[str, int, str]] = {} # (length, family, base size) -> font
+
+    def _init_timer(self, canvas: tk.Canvas, x: int, y: int, champ_name: str, spell_name: str, app_ref, tags=()):
+        self.canvas = canvas
         self.champ_name = champ_name
         self.spell_name = spell_name
         self.app_ref = app_ref # Reference to main app to access cache
         self.is_active = False
-        self.timer_job = None
 
         self.icon_img = AssetManager.load_icon("spells", spell_name, (Config.ICON_SIZE, Config.ICON_SIZE))
-        self.create_image(0, 0, image=self.icon_img, anchor="nw")
-        
-        self.dim_img = AssetManager.create_dim_layer((Config.ICON_SIZE, Config.ICON_SIZE))
-        self.dim_id = self.create_image(0, 0, image=self.dim_img, anchor="nw", state="hidden")
-        self.text_id = self.create_text(Config.ICON_SIZE//2, Config.ICON_SIZE//2, text="", state="hidden")
+        self.icon_id = canvas.create_image(x, y, image=self.icon_img, anchor="nw", tags=tags)
 
-        self.bind("<Button-1>", self._on_left_click)  
-        self.bind("<Button-3>", self._on_right_click) 
+        # Dim layer + countdown label as one pre-rendered image (see AssetManager.load_countdown_glyph)
+        self.glyph_id = canvas.create_image(x, y, anchor="nw", state="hidden", tags=tags)
+        self.glyph_img: Optional[ImageTk.PhotoImage] = None # Keeps the shown glyph alive if evicted
+        self._shown_text: Optional[str] = None
 
     def _on_left_click(self, event):
         if self.is_active: return
-        key = self.spell_name.lower()
-        base_cd = Config.SPELL_TIMERS.get(key, 300)
-        
-        # --- CALCULATE COOLDOWN WITH HASTE ---
-        # Get current haste from app cache (updated in background)
-        current_haste = self.app_ref.get_haste(self.champ_name)
-        
-        # Formula: ReducedCooldown = Base * (100 / (100 + Haste))
-        if current_haste > 0:
-            final_cd = base_cd * (100 / (100 + current_haste))
-            final_cd = int(final_cd)
-            print(f"[Timer] {self.champ_name} ({self.spell_name}): Base {base_cd}s -> Haste {current_haste} -> {final_cd}s")
-        else:
-            final_cd = base_cd
-
-        self._start_timer(final_cd)
+        self._start_timer(self.app_ref.engine.start(self.champ_name, self.spell_name))
 
     def _on_right_click(self, event):
-        if self.is_active: self._reset()
+        if self.is_active:
+            self.app_ref.engine.reset(self.champ_name, self.spell_name)
+            self._reset()
 
-    def _start_timer(self, duration):
+    def _start_timer(self, deadline: float):
         self.is_active = True
-        self.itemconfig(self.dim_id, state="normal")
-        self.itemconfig(self.text_id, state="normal")
-        self._tick(duration)
+        self.canvas.itemconfig(self.glyph_id, state="normal")
+        self.app_ref.timers.schedule(self, deadline)
 
-    def _get_adaptive_font(self, text: str) -> Tuple[str, int, str]:
+    @staticmethod
+    def _get_adaptive_font(text: str) -> Tuple[str, int, str]:
         length = len(text)
+        key = (length, Config.FONT_FAMILY, Config.BASE_FONT_SIZE) # Font config changes miss instead of going stale
+        font_spec = SpellTimer._font_cache.get(key)
+        if font_spec: return font_spec
         size = Config.BASE_FONT_SIZE
         if length <= 2: size = Config.BASE_FONT_SIZE + 2
         elif length == 3: size = Config.BASE_FONT_SIZE + 1
         elif length == 4: size = Config.BASE_FONT_SIZE - 1
         elif length >= 5: size = Config.BASE_FONT_SIZE - 3
-        return (Config.FONT_FAMILY, size, "bold")
-
-    def _draw_outlined_text(self, text):
-        self.delete("timer_text")
-        cx, cy = Config.ICON_SIZE // 2, Config.ICON_SIZE // 2
-        font_spec = self._get_adaptive_font(text)
-        offsets = [(-1, -1), (0, -1), (1, -1), (-1,  0), (1,  0), (-1,  1), (0,  1), (1,  1)]
-        for ox, oy in offsets:
-            self.create_text(cx + ox, cy + oy, text=text, font=font_spec, fill=Config.COLOR_TEXT_OUTLINE, tags="timer_text", anchor="center")
-        self.create_text(cx, cy, text=text, font=font_spec, fill=Config.COLOR_TEXT_ACTIVE, tags="timer_text", anchor="center")
-
-    def _tick(self, remaining):
+        font_spec = (Config.FONT_FAMILY, size, "bold")
+        SpellTimer._font_cache[key] = font_spec
+        return font_spec
+
+    def _draw_outlined_text(self, text: str):
+        if text == self._shown_text: return
+        self.glyph_img = AssetManager.load_countdown_glyph(text)
+        self.canvas.itemconfig(self.glyph_id, image=self.glyph_img)
+        self._shown_text = text
+
+    def _tick(self, remaining: int):
+        """Renders the countdown. Called by TimerScheduler with whole seconds left."""
         if remaining <= 0:
             self._reset()
             return
         m, s = divmod(remaining, 60)
         text = f"{m}:{s:02}" if remaining >= 60 else str(remaining)
         self._draw_outlined_text(text)
-        self.timer_job = self.after(1000, lambda: self._tick(remaining - 1))
 
     def _reset(self):
         self.is_active = False
-        if self.timer_job: self.after_cancel(self.timer_job)
-        self.delete("timer_text")
-        self.itemconfig(self.dim_id, state="hidden")
+        self.app_ref.timers.cancel(self)
+        self.canvas.itemconfig(self.glyph_id, state="hidden")
+        self._shown_text = None
+
+class SpellTimerWidget(SpellTimer, tk.Canvas):
+    """A spell as its own Canvas widget (Config.RENDERER = "widgets")."""
+    def __init__(self, parent, champ_name: str, spell_name: str, app_ref):
+        tk.Canvas.__init__(self, parent, width=Config.ICON_SIZE, height=Config.ICON_SIZE,
+                           bg=Config.COLOR_BG, highlightthickness=0)
+        self._init_timer(self, 0, 0, champ_name, spell_name, app_ref)
+
+        self.bind("<Button-1>", self._on_left_click)  
+        self.bind("<Button-3>", self._on_right_click) 
+
+class SpellSlot(SpellTimer):
+    """A spell drawn as two image items on EnemyPanel; clicks are routed by hit-testing."""
+    def __init__(self, canvas: tk.Canvas, x: int, y: int, champ_name: str, spell_name: str, app_ref, tags=()):
+        self._init_timer(canvas, x, y, champ_name, spell_name, app_ref, tags)
+        self.bbox = (x, y, x + Config.ICON_SIZE, y + Config.ICON_SIZE)
+
+    def contains(self, x: int, y: int) -> bool:
+        x0, y0, x1, y1 = self.bbox
+        return x0 <= x < x1 and y0 <= y < y1
+
+    def shift(self, dx: int, dy: int):
+        x0, y0, x1, y1 = self.bbox
+        self.bbox = (x0 + dx, y0 + dy, x1 + dx, y1 + dy)
+
+# --- ENEMY ROWS ---
+# Both renderers expose the same interface to OverlayApp._reconcile_rows:
+#   panel.add_row(enemy, app_ref) -> row, panel.layout(rows in display order)
+#   row.set_spells(enemy) -> bool (replaced any), row.destroy()
+class RowLayout(NamedTuple):
+    """How a roster is arranged: one full-size column, or dense columns above Config.COMPACT_ABOVE."""
+    compact: bool
+    per_column: int
+    pad_y: int
+    separators: bool
+
+    @staticmethod
+    def for_count(count: int) -> "RowLayout":
+        if count > Config.COMPACT_ABOVE:
+            columns = -(-count // Config.COMPACT_ROWS)
+            return RowLayout(True, -(-count // columns), Config.COMPACT_ROW_PADDING_Y, False) # Balanced columns
+        return RowLayout(False, max(count, 1), Config.ROW_PADDING_Y, Config.SHOW_SEPARATOR)
+
+    def cell(self, index: int) -> Tuple[int, int]:
+        """(column, row) of the index-th enemy."""
+        return divmod(index, self.per_column)
+
+class WidgetRow:
+    """One enemy as a Frame with a champion Label and two SpellTimerWidgets."""
+    def __init__(self, parent: tk.Misc, enemy: Dict, app_ref):
+        self.app_ref = app_ref
+        self.frame = tk.Frame(parent, bg=Config.COLOR_BG)
+        self.sep = tk.Frame(self.frame, bg=Config.COLOR_SEPARATOR, height=1) # Packed by set_separator()
+        self.body = tk.Frame(self.frame, bg=Config.COLOR_BG)
+        self.body.pack(fill="x", pady=Config.ROW_PADDING_Y)
+        self.separator: Optional[bool] = None
+        self.pad_y = Config.ROW_PADDING_Y
+        self.cell: Optional[Tuple[int, int]] = None # Grid (column, row) in the compact layout
+
+        self.champ_icon = AssetManager.load_icon("champions", enemy['champ'], (Config.ICON_SIZE, Config.ICON_SIZE), is_round=True)
+        lbl = tk.Label(self.body, image=self.champ_icon, bg=Config.COLOR_BG, bd=0)
+        lbl.pack(side="left", padx=(0, 8))
+
+        self.spells: List[SpellTimerWidget] = []
+        for s_name in [enemy['spell1'], enemy['spell2']]:
+            # Pass the app reference so the button can query the haste cache
+            sw = SpellTimerWidget(self.body, enemy['champ'], s_name, app_ref)
+            sw.pack(side="left", padx=3)
+            self.spells.append(sw)
+
+    def set_separator(self, visible: bool):
+        if visible == self.separator: return
+        self.separator = visible
+        if visible:
+            self.sep.pack(fill="x", padx=10, pady=2, before=self.body)
+        else:
+            self.sep.pack_forget()
+
+    def set_padding(self, pad_y: int):
+        if pad_y == self.pad_y: return
+        self.pad_y = pad_y
+        self.body.pack_configure(pady=pad_y)
+
+    def set_spells(self, enemy: Dict) -> bool:
+        """Replaces spells that changed; untouched ones keep their running timers."""
+        replaced = False
+        for i, s_name in enumerate([enemy['spell1'], enemy['spell2']]):
+            old = self.spells[i]
+            if old.spell_name == s_name: continue
+            self.app_ref.timers.cancel(old)
+            sw = SpellTimerWidget(self.body, enemy['champ'], s_name, self.app_ref)
+            sw.pack(side="left", padx=3, after=old)
+            old.destroy()
+            self.spells[i] = sw
+            replaced = True
+        return replaced
+
+    def destroy(self):
+        for sw in self.spells:
+            self.app_ref.timers.cancel(sw)
+        self.frame.destroy()
+
+class WidgetPanel:
+    """Rows as widget trees in `parent` (Config.RENDERER = "widgets"): packed in one
+    column, or gridded into columns in the compact layout."""
+    def __init__(self, parent: tk.Misc):
+        self.parent = parent
+        self.compact = False
+
+    def add_row(self, enemy: Dict, app_ref) -> WidgetRow:
+        return WidgetRow(self.parent, enemy, app_ref)
+
+    def layout(self, rows: List[WidgetRow]):
+        shape = RowLayout.for_count(len(rows))
+        if shape.compact != self.compact:
+            # Tk refuses pack and grid slaves in the same master: release every row first
+            for row in rows:
+                if self.compact: row.frame.grid_forget()
+                else: row.frame.pack_forget()
+                row.cell = None
+            self.compact = shape.compact
+        for i, row in enumerate(rows):
+            row.set_padding(shape.pad_y)
+            row.set_separator(shape.separators and shape.cell(i)[1] > 0)
+        if self.compact:
+            self._grid(rows, shape)
+        else:
+            self._pack(rows)
+
+    @staticmethod
+    def _grid(rows: List[WidgetRow], shape: RowLayout):
+        for i, row in enumerate(rows):
+            cell = shape.cell(i)
+            if cell != row.cell:
+                column, r = cell
+                row.frame.grid(column=column, row=r, sticky="ew", padx=(Config.COMPACT_COLUMN_GAP if column else 0, 0))
+                row.cell = cell
+
+    def _pack(self, rows: List[WidgetRow]):
+        # Repack only rows that are out of place; pack_slaves() is the current display order
+        current = list(self.parent.pack_slaves())
+        for i, row in enumerate(rows):
+            if i >= len(current) or current[i] is not row.frame:
+                if row.frame in current:
+                    current.remove(row.frame)
+                if i == 0 and current:
+                    row.frame.pack(fill="x", before=current[0])
+                elif i > 0:
+                    row.frame.pack(fill="x", after=rows[i - 1].frame)
+                else:
+                    row.frame.pack(fill="x")
+                current.insert(i, row.frame)
+
+class CanvasRow:
+    """One enemy as items on EnemyPanel, grouped under a tag so it can be moved or deleted at once."""
+    def __init__(self, panel: "EnemyPanel", enemy: Dict, app_ref, tag: str):
+        self.panel = panel
+        self.app_ref = app_ref
+        self.tag = tag
+        self.x = self.y = 0 # Row origin (top left of the icons); rows are drawn at 0,0 and moved into place by layout()
+        self.separator: Optional[bool] = None
+        size = Config.ICON_SIZE
+
+        line_y = -(Config.ROW_PADDING_Y + EnemyPanel.SEP_PAD + 1) # Mid-gap above the icons, as in the widget tree
+        self.sep_id = panel.create_line(EnemyPanel.SEP_INSET, line_y, panel.WIDTH - EnemyPanel.SEP_INSET, line_y,
+                                        fill=Config.COLOR_SEPARATOR, state="hidden", tags=tag)
+        self.champ_icon = AssetManager.load_icon("champions", enemy['champ'], (size, size), is_round=True)
+        panel.create_image(0, 0, image=self.champ_icon, anchor="nw", tags=tag)
+
+        self.spells = [SpellSlot(panel, self._slot_x(i), 0, enemy['champ'], s_name, app_ref, (tag,))
+                      for i, s_name in enumerate([enemy['spell1'], enemy['spell2']])]
+
+    @staticmethod
+    def _slot_x(index: int) -> int:
+        return EnemyPanel.SPELL_X + index * (Config.ICON_SIZE + 2 * EnemyPanel.SPELL_PAD)
+
+    def move_to(self, x: int, y: int):
+        dx, dy = x - self.x, y - self.y
+        if not (dx or dy): return
+        self.panel.move(self.tag, dx, dy)
+        for slot in self.spells:
+            slot.shift(dx, dy)
+        self.x, self.y = x, y
+
+    def set_separator(self, visible: bool):
+        if visible == self.separator: return
+        self.separator = visible
+        self.panel.itemconfig(self.sep_id, state="normal" if visible else "hidden")
+
+    def set_spells(self, enemy: Dict) -> bool:
+        """Replaces spells that changed; untouched ones keep their running timers."""
+        replaced = False
+        for i, s_name in enumerate([enemy['spell1'], enemy['spell2']]):
+            old = self.spells[i]
+            if old.spell_name == s_name: continue
+            self.app_ref.timers.cancel(old)
+            self.panel.delete(old.icon_id, old.glyph_id)
+            self.spells[i] = SpellSlot(self.panel, self.x + self._slot_x(i), self.y, enemy['champ'], s_name, self.app_ref, (self.tag,))
+            replaced = True
+        return replaced
+
+    def destroy(self):
+        for slot in self.spells:
+            self.app_ref.timers.cancel(slot)
+        self.panel.delete(self.tag)
+
+class EnemyPanel(tk.Canvas):
+    """The whole enemy list drawn on one Canvas (Config.RENDERER = "canvas").
+
+    Replaces ~30 Frames/Labels/Canvases with plain canvas items: one window and no
+    geometry-manager passes. The layout matches the widget tree's paddings, including
+    the compact columns used for large rosters (RowLayout).
+    """
+    CHAMP_GAP = 8   # Champion icon -> first spell (Label padx)
+    SPELL_PAD = 3   # Around each spell icon (SpellTimerWidget padx)
+    SEP_INSET = 10  # Separator line inset (separator Frame padx)
+    SEP_PAD = 2     # Above/below the separator (separator Frame pady)
+    SPELL_X = Config.ICON_SIZE + CHAMP_GAP + SPELL_PAD
+    WIDTH = SPELL_X + 2 * (Config.ICON_SIZE + 2 * SPELL_PAD) - SPELL_PAD
+
+    def __init__(self, parent):
+        super().__init__(parent, width=self.WIDTH, height=0, bg=Config.COLOR_BG, highlightthickness=0)
+        self.rows: List[CanvasRow] = []
+        self._tags = itertools.count()
+        self.bind("<Button-1>", lambda e: self._dispatch(e, "_on_left_click"))
+        self.bind("<Button-3>", lambda e: self._dispatch(e, "_on_right_click"))
+
+    def add_row(self, enemy: Dict, app_ref) -> CanvasRow:
+        return CanvasRow(self, enemy, app_ref, f"row{next(self._tags)}")
+
+    def layout(self, rows: List[CanvasRow]):
+        """Moves rows whose cell changed; rows already in place cost nothing."""
+        self.rows = rows
+        shape = RowLayout.for_count(len(rows))
+        sep_block = 2 * self.SEP_PAD + 1 if shape.separators else 0
+        pitch = Config.ICON_SIZE + 2 * shape.pad_y + sep_block
+        column_pitch = self.WIDTH + Config.COMPACT_COLUMN_GAP
+        for i, row in enumerate(rows):
+            column, r = shape.cell(i)
+            row.move_to(column * column_pitch, r * pitch + shape.pad_y)
+            row.set_separator(shape.separators and r > 0)
+        columns = -(-len(rows) // shape.per_column)
+        height = min(len(rows), shape.per_column) * pitch - sep_block if rows else 0
+        width = max(columns, 1) * column_pitch - Config.COMPACT_COLUMN_GAP
+        if (int(self.cget("width")), int(self.cget("height"))) != (width, height):
+            self.configure(width=width, height=height)
+
+    def _dispatch(self, event, handler: str):
+        for row in self.rows:
+            for slot in row.spells:
+                if slot.contains(event.x, event.y):
+                    getattr(slot, handler)(event)
+                    return
+
+# --- TIMER JOURNAL ---
+class TimerJournal(threading.Thread):
+    """Append-only record of timer starts/resets so a restarted overlay can resume them.
+
+    One JSON line per change: {"match", "champ", "spell", "deadline"} with the deadline
+    in game time (GameClock), or null for a reset. The Tk thread only updates an
+    in-memory view and queues the line; this thread writes, batching fsyncs to one
+    per JOURNAL_FSYNC_INTERVAL. The file is rewritten with just the live timers
+    (compact) when a match starts or ends. Small state files (config.json) are
+    written atomically through the same queue.
+    """
+    def __init__(self, path: str):
+        super().__init__(name="TimerJournal", daemon=True)
+        self.path = path
+        self._queue: "queue.Queue[Optional[Tuple[str, Any]]]" = queue.Queue()
+        self._timers: Dict[str, Dict[Tuple[str, str], Optional[float]]] = {} # match -> (champ, spell) -> deadline
+        self._lock = threading.Lock()
+        self._loaded = threading.Event()
+        self._torn = False
+
+    def record(self, match: str, champ: str, spell: str, deadline: Optional[float]):
+        with self._lock:
+            self._timers.setdefault(match, {})[(champ, spell)] = deadline
+        line = json.dumps({"match": match, "champ": champ, "spell": spell, "deadline": deadline})
+        self._queue.put(("append", line))
+
+    def active(self, match: str) -> Dict[Tuple[str, str], float]:
+        """Running timers journaled for `match`; empty until the file has been read."""
+        if not self._loaded.is_set(): return {}
+        with self._lock:
+            timers = self._timers.get(match, {})
+            return {key: deadline for key, deadline in timers.items() if deadline is not None}
+
+    def compact(self, match: Optional[str], now: float = 0.0):
+        """Rewrites the journal with only `match`'s timers still running at `now` (None: drop everything)."""
+        self._queue.put(("compact", (match, now)))
+
+    def save_json(self, path: str, data: Any):
+        self._queue.put(("save", (path, data)))
+
+    def close(self, timeout: float = 2.0):
+        """Flushes queued writes (quit paths)."""
+        self._queue.put(None)
+        if self.is_alive(): self.join(timeout)
+
+    def run(self):
+        self._load()
+        journal = None
+        try:
+            while True:
+                batch = [self._queue.get()]
+                # Gather everything that arrives within one fsync interval
+                flush_at = time.monotonic() + Config.JOURNAL_FSYNC_INTERVAL
+                while batch[-1] is not None and (left := flush_at - time.monotonic()) > 0:
+                    try:
+                        batch.append(self._queue.get(timeout=left))
+                    except queue.Empty:
+                        break
+                dirty = False
+                for job in batch:
+                    if job is None: continue
+                    kind, payload = job
+                    try:
+                        if kind == "append":
+                            if journal is None:
+                                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                                journal = open(self.path, "a", encoding="utf-8")
+                                if self._torn: journal.write("\n")
+                                self._torn = False
+                            journal.write(payload + "\n")
+                            dirty = True
+                        elif kind == "compact":
+                            if journal is not None:
+                                journal.close()
+                                journal = None
+                            TimerJournal._write_atomic(self.path, self._compacted(*payload))
+                        elif kind == "save":
+                            path, data = payload
+                            TimerJournal._write_atomic(path, json.dumps(data))
+                            print("[Config] Settings saved.")
+                    except OSError as e:
+                        print(f"[Journal] {kind} failed: {e}")
+                if dirty and journal is not None:
+                    journal.flush()
+                    os.fsync(journal.fileno())
+                if batch[-1] is None:
+                    return
+        finally:
+            if journal is not None: journal.close()
+
+    def _compacted(self, match: Optional[str], now: float) -> str:
+        # Runs on the writer thread, after _load: the file's records are part of the state
+        with self._lock:
+            live = {key: d for key, d in self._timers.get(match, {}).items() if d is not None and d > now}
+            self._timers = {match: live} if match and live else {}
+        return "".join(json.dumps({"match": match, "champ": champ, "spell": spell, "deadline": deadline}) + "\n"
+                       for (champ, spell), deadline in live.items())
+
+    def _load(self):
+        timers: Dict[str, Dict[Tuple[str, str], Optional[float]]] = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except OSError:
+            text = ""
+        for line in text.splitlines():
+            try:
+                rec = json.loads(line)
+                timers.setdefault(rec["match"], {})[(rec["champ"], rec["spell"])] = rec["deadline"]
+            except (ValueError, KeyError, TypeError):
+                continue # Torn last line after a crash
+        # Appends must not continue a torn line
+        self._torn = bool(text) and not text.endswith("\n")
+        with self._lock:
+            # Records made while loading are newer than the file's
+            for match, entries in self._timers.items():
+                timers.setdefault(match, {}).update(entries)
+            self._timers = timers
+        self._loaded.set()
+
+    @staticmethod
+    def _write_atomic(path: str, text: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+# --- TIMER ENGINE ---
+class TimerEngine:
+    """UI-free core: roster, haste, game clock and running cooldowns keyed by (champion, spell).
+
+    OverlayApp renders it with Tk; --headless drives it from stdin. Every change is
+    reported to `listeners` as (event, data): match, roster, started, reset,
+    expired, paused, resumed, match_end.
+    """
+    def __init__(self, journal: Optional[TimerJournal] = None):
+        self.clock = GameClock()
+        self.journal = journal
+        self.match_id: Optional[str] = None
+        self.enemies: Dict[str, Dict] = {} # champ -> parsed enemy (spells, haste)
+        self.listeners: List[Callable[[str, Dict], None]] = []
+        self._deadlines: Dict[Tuple[str, str], float] = {} # (champ, spell) -> GameClock deadline
+        self._stamps: Dict[Tuple[str, str], float] = {}    # (champ, spell) -> game time of the last start/reset
+
+    def _emit(self, event: str, data: Dict):
+        for listener in self.listeners:
+            listener(event, data)
+
+    # Poller input
+    def set_match(self, match_id: str):
+        if match_id == self.match_id: return
+        if self.match_id is not None or self._deadlines:
+            # The last match ended without GameEnd (left, crashed, remake): its deadlines are another game's times
+            self._deadlines.clear()
+            self._stamps.clear()
+            if self.journal: self.journal.compact(match_id, self.clock.now())
+        self.match_id = match_id
+        self._emit("match", {"match": match_id})
+
+    def sync_clock(self, game_time: float, wall: float) -> bool:
+        """See GameClock.sync. Returns True if displayed timers need refreshing."""
+        was_paused = self.clock.paused
+        changed = self.clock.sync(game_time, wall)
+        if self.clock.paused != was_paused:
+            self._emit("paused" if self.clock.paused else "resumed", {"game_time": game_time})
+        return changed
+
+    def update_roster(self, enemies: List[Dict]):
+        self.enemies = {enemy['champ']: enemy for enemy in enemies}
+        self._emit("roster", {"enemies": enemies})
+
+    def end_match(self):
+        self._deadlines.clear()
+        self._stamps.clear()
+        self.enemies.clear()
+        if self.journal: self.journal.compact(None)
+        self._emit("match_end", {"match": self.match_id})
+        self.match_id = None
+
+    # Timers
+    def cooldown(self, champ: str, spell: str) -> float:
+        base_cd = Config.SPELL_TIMERS.get(spell.lower(), 300)
+        haste = self.enemies.get(champ, {}).get('haste', 0)
+        if haste <= 0:
+            return base_cd
+        # Formula: ReducedCooldown = Base * (100 / (100 + Haste))
+        final_cd = int(base_cd * (100 / (100 + haste)))
+        print(f"[Timer] {champ} ({spell}): Base {base_cd}s -> Haste {haste} -> {final_cd}s")
+        return final_cd
+
+    def start(self, champ: str, spell: str) -> float:
+        """Starts (or restarts) a cooldown; returns its deadline in GameClock time."""
+        duration = self.cooldown(champ, spell)
+        now = self.clock.now()
+        deadline = now + duration
+        self._deadlines[(champ, spell)] = deadline
+        self._stamps[(champ, spell)] = now
+        if self.journal and self.match_id:
+            self.journal.record(self.match_id, champ, spell, deadline)
+        self._emit("started", {"champ": champ, "spell": spell, "duration": duration, "deadline": deadline, "at": now})
+        return deadline
+
+    def reset(self, champ: str, spell: str) -> bool:
+        if self._deadlines.pop((champ, spell), None) is None:
+            return False
+        now = self.clock.now()
+        self._stamps[(champ, spell)] = now
+        if self.journal and self.match_id:
+            self.journal.record(self.match_id, champ, spell, None)
+        self._emit("reset", {"champ": champ, "spell": spell, "at": now})
+        return True
+
+    def actions(self) -> List[Tuple[str, str, Optional[float], float]]:
+        """(champ, spell, deadline or None if reset, game time) of the last start/reset per spell."""
+        return [(champ, spell, self._deadlines.get((champ, spell)), at) for (champ, spell), at in self._stamps.items()]
+
+    def apply_remote(self, champ: str, spell: str, deadline: Optional[float], at: float) -> bool:
+        """Applies a peer's start (deadline) or reset (None) made at game time `at`.
+
+        The newest action per spell wins, so peers converge whatever order messages arrive in.
+        Emits started/reset with "remote": True; returns False if it was stale.
+        """
+        key = (champ, spell)
+        if at < self._stamps.get(key, float("-inf")):
+            return False
+        self._stamps[key] = at
+        if deadline is None:
+            if self._deadlines.pop(key, None) is None: return True
+        else:
+            self._deadlines[key] = deadline
+        if self.journal and self.match_id:
+            self.journal.record(self.match_id, champ, spell, deadline)
+        if deadline is None:
+            self._emit("reset", {"champ": champ, "spell": spell, "at": at, "remote": True})
+        else:
+            self._emit("started", {"champ": champ, "spell": spell, "deadline": deadline, "at": at, "remote": True})
+        return True
+
+    def deadline(self, champ: str, spell: str) -> Optional[float]:
+        deadline = self._deadlines.get((champ, spell))
+        return deadline if deadline is not None and deadline > self.clock.now() else None
+
+    def remaining(self, champ: str, spell: str) -> Optional[int]:
+        deadline = self.deadline(champ, spell)
+        return math.ceil(deadline - self.clock.now()) if deadline is not None else None
+
+    def next_deadline(self) -> Optional[float]:
+        return min(self._deadlines.values(), default=None)
+
+    def expire_due(self) -> List[Tuple[str, str]]:
+        """Drops finished cooldowns and reports them as "expired"."""
+        now = self.clock.now()
+        expired = [key for key, deadline in self._deadlines.items() if deadline <= now]
+        for champ, spell in expired:
+            del self._deadlines[(champ, spell)]
+            self._emit("expired", {"champ": champ, "spell": spell})
+        return expired
+
+    def restore(self) -> int:
+        """Adopts timers journaled for the current match (restart/reconnect), then compacts the journal."""
+        if not self.journal or not self.match_id: return 0
+        now = self.clock.now()
+        restored = 0
+        for (champ, spell), deadline in self.journal.active(self.match_id).items():
+            if deadline > now and (champ, spell) not in self._deadlines:
+                self._deadlines[(champ, spell)] = deadline
+                self._emit("started", {"champ": champ, "spell": spell, "deadline": deadline, "restored": True})
+                restored += 1
+        if restored:
+            print(f"[Journal] Restored {restored} running timer(s)")
+        self.journal.compact(self.match_id, now)
+        return restored
+
+    def snapshot(self) -> Dict:
+        spells = []
+        for enemy in self.enemies.values():
+            for spell in (enemy['spell1'], enemy['spell2']):
+                spells.append({"champ": enemy['champ'], "spell": spell, "haste": enemy.get('haste', 0),
+                               "remaining": self.remaining(enemy['champ'], spell)})
+        return {"match": self.match_id, "game_time": round(self.clock.now(), 2), "paused": self.clock.paused,
+                "spells": spells}
+
+# --- LAN SYNC ---
+class TimerSync:
+    """Shares timer starts/resets between overlays over TCP (opt-in, --sync-serve / --sync-join).
+
+    One process serves a hub, the others join it. Messages are JSON lines:
+      {"type": "hello", "match"}                           client -> hub, on connect and match change
+      {"type": "timer", "match", "champ", "spell", "deadline", "at"}  deadline None = reset
+      {"type": "snapshot", "match", "timers": [timer, ...]}  hub -> client, reply to hello
+    Deadlines and "at" stamps are game times, identical for everyone in the match,
+    so the newest action per spell wins everywhere (TimerEngine.apply_remote) and a
+    late joiner is brought up to date by one snapshot. The hub keeps that state per
+    match and fans each message out with plain buffered writes; a subscriber that
+    stops reading is dropped instead of slowing the others.
+
+    Networking runs on its own asyncio loop thread. Remote messages are handed to
+    `deliver` on that thread; consumers queue them and call apply() on their own thread.
+    """
+    def __init__(self, deliver: Callable[[Dict], None]):
+        self.deliver = deliver
+        self.match_id: Optional[str] = None
+        self._loop = None
+        self._writers: set = set()                                # Hub: subscribers; client: the hub connection
+        self._state: Dict[str, Dict[Tuple[str, str], Dict]] = {}  # Hub: match -> (champ, spell) -> last timer msg
+        self._server = None
+        self.address: Optional[Tuple[str, int]] = None           # Hub: bound address once listening
+
+    # Setup (any thread)
+    def serve(self, host: str, port: int):
+        self._start(self._serve(host, port))
+
+    def join(self, host: str, port: int):
+        self._start(self._join(host, port))
+
+    def attach(self, engine: TimerEngine):
+        """Publishes the engine's local starts/resets and announces its match."""
+        def on_event(event: str, data: Dict):
+            if event == "match":
+                self.set_match(data["match"])
+            elif event in ("started", "reset") and not data.get("remote") and not data.get("restored"):
+                if engine.match_id is None: return
+                self.publish({"type": "timer", "match": engine.match_id, "champ": data["champ"], "spell": data["spell"],
+                              "deadline": data.get("deadline"), "at": data["at"]})
+        engine.listeners.append(on_event)
+        if engine.match_id: self.set_match(engine.match_id)
+
+    def apply(self, engine: TimerEngine, msg: Dict):
+        """Applies a delivered message to `engine` (on the engine's thread).
+
+        A snapshot answers our hello after every (re)connect: local actions newer than
+        the hub's copy (made while disconnected) are published back to it.
+        """
+        if msg.get("match") != engine.match_id: return
+        timers = msg["timers"] if msg.get("type") == "snapshot" else [msg]
+        for timer in timers:
+            engine.apply_remote(timer["champ"], timer["spell"], timer.get("deadline"), timer["at"])
+        if msg.get("type") != "snapshot": return
+        known = {(timer["champ"], timer["spell"]): timer["at"] for timer in timers}
+        for champ, spell, deadline, at in engine.actions():
+            if at > known.get((champ, spell), float("-inf")):
+                self.publish({"type": "timer", "match": engine.match_id, "champ": champ, "spell": spell,
+                              "deadline": deadline, "at": at})
+
+    def publish(self, msg: Dict):
+        if self._loop: self._loop.call_soon_threadsafe(self._on_local, msg)
+
+    @staticmethod
+    def _number(value: Any) -> bool:
+        return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+    @staticmethod
+    def _timer(msg: Any) -> Optional[Dict]:
+        """A well-formed timer message with only the protocol's keys, or None."""
+        if not (isinstance(msg, dict) and isinstance(msg.get("match"), str) and isinstance(msg.get("champ"), str)
+                and isinstance(msg.get("spell"), str) and TimerSync._number(msg.get("at"))):
+            return None
+        deadline = msg.get("deadline")
+        if deadline is not None and not TimerSync._number(deadline):
+            return None
+        return {"type": "timer", "match": msg["match"], "champ": msg["champ"], "spell": msg["spell"],
+                "deadline": deadline, "at": msg["at"]}
+
+    @staticmethod
+    def _validate(msg: Any) -> Optional[Dict]:
+        """Checks a received message's shape once, before anything stores or applies it."""
+        if not isinstance(msg, dict): return None
+        kind = msg.get("type")
+        if kind == "timer":
+            return TimerSync._timer(msg)
+        if kind == "hello":
+            return msg if isinstance(msg.get("match"), str) else None
+        if kind == "snapshot" and isinstance(msg.get("match"), str) and isinstance(msg.get("timers"), list):
+            timers = [TimerSync._timer(timer) for timer in msg["timers"]]
+            if None not in timers:
+                return {"type": "snapshot", "match": msg["match"], "timers": timers}
+        return None
+
+    def set_match(self, match_id: str):
+        self.match_id = match_id
+        if self._loop: self._loop.call_soon_threadsafe(self._send_hello)
+
+    # Event loop thread
+    def _start(self, coro):
+        import asyncio
+        self._loop = asyncio.new_event_loop()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(coro)
+        threading.Thread(target=run, name="TimerSync", daemon=True).start()
+
+    @staticmethod
+    def _encode(msg: Dict) -> bytes:
+        return (json.dumps(msg) + "\n").encode()
+
+    def _send(self, writer, data: bytes):
+        if writer.is_closing(): return
+        writer.write(data)
+        if writer.transport.get_write_buffer_size() > Config.SYNC_MAX_BUFFER:
+            print("[Sync] Dropping a subscriber that stopped reading")
+            writer.close()
+            self._writers.discard(writer)
+
+    def _broadcast(self, msg: Dict, skip=None):
+        data = TimerSync._encode(msg)
+        for writer in list(self._writers):
+            if writer is not skip:
+                self._send(writer, data)
+
+    def _record(self, msg: Dict) -> bool:
+        """Hub: keeps the newest timer message per spell. Returns False for stale or rejected ones.
+
+        Only the newest match is kept, with at most Config.SYNC_MAX_TIMERS spells, so
+        neither old matches nor a misbehaving peer can grow the state (or snapshots) unbounded.
+        """
+        if msg["match"] not in self._state:
+            self._state = {msg["match"]: {}}
+        timers = self._state[msg["match"]]
+        key = (msg["champ"], msg["spell"])
+        current = timers.get(key)
+        if current is None and len(timers) >= Config.SYNC_MAX_TIMERS:
+            return False
+        if current is not None and msg["at"] < current["at"]:
+            return False
+        timers[key] = msg
+        return True
+
+    def _on_local(self, msg: Dict):
+        if self._server is None:
+            # Client: the hub records and fans out
+            self._broadcast(msg)
+        elif self._record(msg):
+            self._broadcast(msg)
+
+    def _send_hello(self):
+        if self._server is None and self.match_id:
+            self._broadcast({"type": "hello", "match": self.match_id})
+
+    async def _serve(self, host: str, port: int):
+        import asyncio
+        try:
+            self._server = await asyncio.start_server(self._on_peer, host, port, limit=Config.SYNC_MAX_LINE)
+        except OSError as e:
+            print(f"[Sync] Could not listen on {host}:{port}: {e}")
+            return
+        self.address = self._server.sockets[0].getsockname()[:2]
+        print(f"[Sync] Hub listening on {self.address[0]}:{self.address[1]}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _on_peer(self, reader, writer):
+        peer = writer.get_extra_info("peername")
+        print(f"[Sync] Peer connected: {peer}")
+        self._writers.add(writer)
+        try:
+            async for line in reader:
+                try:
+                    msg = TimerSync._validate(json.loads(line))
+                except ValueError:
+                    msg = None
+                if msg is None:
+                    continue
+                if msg["type"] == "hello":
+                    timers = list(self._state.get(msg["match"], {}).values())
+                    self._send(writer, TimerSync._encode({"type": "snapshot", "match": msg["match"], "timers": timers}))
+                elif msg["type"] == "timer" and self._record(msg):
+                    self._broadcast(msg, skip=writer)
+                    self.deliver(msg)
+        except ValueError:
+            print(f"[Sync] Dropping {peer}: line longer than {Config.SYNC_MAX_LINE} bytes")
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+            print(f"[Sync] Peer disconnected: {peer}")
+
+    async def _join(self, host: str, port: int):
+        import asyncio
+        while True:
+            try:
+                reader, writer = await asyncio.open_connection(host, port, limit=Config.SYNC_MAX_LINE)
+            except OSError:
+                await asyncio.sleep(Config.SYNC_RECONNECT_DELAY)
+                continue
+            print(f"[Sync] Joined hub {host}:{port}")
+            self._writers = {writer}
+            self._send_hello()
+            try:
+                async for line in reader:
+                    try:
+                        msg = TimerSync._validate(json.loads(line))
+                    except ValueError:
+                        continue
+                    if msg is not None and msg["type"] != "hello":
+                        self.deliver(msg)
+            except ValueError:
+                print(f"[Sync] Line from hub longer than {Config.SYNC_MAX_LINE} bytes")
+            except (ConnectionError, OSError):
+                pass
+            self._writers = set()
+            writer.close()
+            print(f"[Sync] Lost hub {host}:{port}, reconnecting")
+            await asyncio.sleep(Config.SYNC_RECONNECT_DELAY)
+
+    @staticmethod
+    def parse_address(text: str, default_host: str) -> Tuple[str, int]:
+        """Parses HOST:PORT, HOST or PORT into (host, port)."""
+        if text.isdigit(): return default_host, int(text)
+        host, _, port = text.rpartition(":") if ":" in text else (text, "", "")
+        return host or default_host, int(port) if port else Config.SYNC_PORT
 
 # --- MAIN APP ---
 class OverlayApp:
-    def __init__(self):
-        self.root = tk.Tk()
+    def __init__(self, start_services: bool = True, root: Optional[tk.Tk] = None):
+        """start_services=False builds the UI only (no tray, poller or signal handler), for benchmarks.
+        `root` reuses an existing interpreter: images loaded earlier belong to it."""
+        with StartupProfiler.phase("tk root"):
+            self.root = root or tk.Tk()
         self.root.title("Spell Timer") 
         self.root.configure(bg=Config.COLOR_BG)
         self.root.overrideredirect(True)
@@ -344,8 +2039,15 @@ class OverlayApp:
         self.root.wm_attributes("-alpha", Config.GLOBAL_OPACITY)
 
         self.game_active = False
-        self.enemy_data_cache = {} # Cache to store fresh enemy data
-        self._img_refs = []
+        self.poll_queue: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self.poller = GameDataPoller(self.poll_queue)
+        self.poller.events.subscribe(EventStream.GAME_END, self._on_game_end)
+        self.journal = TimerJournal(Config.JOURNAL_FILE)
+        self.engine = TimerEngine(self.journal) # Roster, haste and cooldown state; widgets only render it
+        self.timers = TimerScheduler(self.root, self.engine.clock)
+        self.engine.listeners.append(self._on_engine_event)
+        self.sync: Optional[TimerSync] = None
+        self._monitor_due: Optional[float] = None
         
         self.saved_x = 0
         self.saved_y = 0
@@ -371,28 +2073,45 @@ class OverlayApp:
 
         self.enemies_frame = tk.Frame(self.inner, bg=Config.COLOR_BG)
         self.enemies_frame.pack()
+        if Config.RENDERER == "canvas":
+            self.panel = EnemyPanel(self.enemies_frame)
+            self.panel.pack()
+        else:
+            self.panel = WidgetPanel(self.enemies_frame)
+        self.rows: Dict[Tuple[str, str, int], Any] = {} # Row key -> WidgetRow/CanvasRow, in display order
 
         self.root.withdraw()
+        if not start_services: return
         
+        self.journal.start()
         self._setup_tray()
         
         signal.signal(signal.SIGINT, self._graceful_exit)
         
+        self.poller.start()
         self._monitor_game_loop()
 
-    def get_haste(self, champ_name: str) -> int:
-        """Returns the current haste for a specific champion from cache."""
-        data = self.enemy_data_cache.get(champ_name, {})
-        return data.get('haste', 0)
-
     def _setup_tray(self):
+        # Built on its own thread: pystray/Pillow imports stay off the Tk startup path
+        threading.Thread(target=self._run_tray, name="Tray", daemon=True).start()
+
+    def _run_tray(self):
+        import pystray
+        from PIL import Image
+
         def quit_app(icon, item):
             print("[Tray] Quitting...")
+            self.poller.stop()
             self._save_config()
+            self.journal.close()
             icon.stop()
             self.root.quit()
             sys.exit(0)
 
+        def on_ready(icon):
+            icon.visible = True
+            StartupProfiler.mark("tray ready")
+
         custom_icon = resource_path("ico/icon.ico")
         flash_icon = resource_path("assets/spells/SummonerFlash.png")
         
@@ -402,6 +2121,11 @@ class OverlayApp:
                 image = Image.open(custom_icon)
             except: pass
             
+        if image is None:
+            # The EXE bundles only the atlas; loose PNGs exist when running from source
+            image = AssetManager._load_from_atlas("spells", "SummonerFlash")
+            if image is not None: image = image.copy() # Detach from the mmap'd atlas
+
         if image is None and os.path.exists(flash_icon):
             image = Image.open(flash_icon)
             
@@ -410,8 +2134,7 @@ class OverlayApp:
 
         menu = pystray.Menu(pystray.MenuItem("Quit", quit_app))
         self.tray_icon = pystray.Icon("SpellTimer", image, "Spell Timer", menu)
-        
-        threading.Thread(target=self.tray_icon.run, daemon=True).start()
+        self.tray_icon.run(setup=on_ready)
 
     def _load_config(self):
         if os.path.exists(Config.CONFIG_FILE):
@@ -435,16 +2158,14 @@ class OverlayApp:
             'y': self.saved_y,
             'pinned': self.is_pinned
         }
-        try:
-            with open(Config.CONFIG_FILE, 'w') as f:
-                json.dump(data, f)
-            print("[Config] Settings saved.")
-        except Exception as e:
-            print(f"[Config] Save error: {e}")
+        # Written atomically by the journal thread: no disk I/O on the UI thread
+        self.journal.save_json(Config.CONFIG_FILE, data)
 
     def _graceful_exit(self, signum, frame):
         print("\n[Spell Timer] Stopping...")
+        self.poller.stop()
         self._save_config()
+        self.journal.close()
         if hasattr(self, 'tray_icon'):
             self.tray_icon.stop()
         self.root.destroy()
@@ -462,61 +2183,141 @@ class OverlayApp:
             self.handle.config(text="::::", fg=Config.COLOR_HANDLE, cursor="fleur")
 
     def _monitor_game_loop(self):
-        data = GameDataManager.fetch_data()
-        if data:
-            # 1. Parse enemies and update cache with fresh data (items/haste)
-            enemies = GameDataManager.parse_enemies(data)
-            for enemy in enemies:
-                self.enemy_data_cache[enemy['champ']] = enemy
-            
-            # 2. Build UI only if game just started
-            if not self.game_active:
-                print("[Spell Timer] Match found!")
-                self._build_enemy_rows(enemies)
-                self.root.deiconify()
-                self.root.geometry(f"+{self.saved_x}+{self.saved_y}")
-                self.root.after(100, self._apply_native_styles)
-                self.game_active = True
-            
-            # NOTE: We do NOT rebuild UI in loop to preserve running timers.
-            # Haste data is fetched from cache dynamically on click.
-            
+        # Network I/O and parsing happen on the poller thread; here we only drain its results.
+        if Metrics.enabled:
+            now = time.monotonic()
+            if self._monitor_due is not None:
+                # How late Tk ran this after(): event-loop stalls show up here first
+                Metrics.record("tk_lag", max(0.0, now - self._monitor_due) * 1000)
+            self._monitor_due = now + Config.QUEUE_CHECK_INTERVAL / 1000
+        try:
+            while True:
+                kind, payload = self.poll_queue.get_nowait()
+                if kind == "event":
+                    self.poller.events.dispatch(payload)
+                elif kind == "roster":
+                    self._on_roster(payload)
+                elif kind == "haste":
+                    self._on_haste_changed(payload)
+                elif kind == "match":
+                    self.engine.set_match(payload)
+                elif kind == "clock":
+                    if self.engine.sync_clock(*payload): self.timers.refresh()
+                elif kind == "no_game":
+                    self._on_no_game()
+                elif kind == "sync":
+                    self._apply_sync(payload)
+        except queue.Empty:
+            pass
+
+        self.root.after(Config.QUEUE_CHECK_INTERVAL, self._monitor_game_loop)
+
+    def _on_roster(self, enemies: List[Dict]):
+        # 1. Fresh items/haste for the engine (read when a timer is started)
+        self.engine.update_roster(enemies)
+
+        # 2. Build UI if the game just started, otherwise apply only what changed
+        # (late roster during loading, reconnect, swaps in custom games) so running timers survive.
+        if not self.game_active:
+            print("[Spell Timer] Match found!")
+            self.engine.restore()
+            self._build_enemy_rows(enemies)
+            self.root.deiconify()
+            self.root.geometry(f"+{self.saved_x}+{self.saved_y}")
+            self.root.after(100, self._apply_native_styles)
+            self.game_active = True
         else:
-            if self.game_active:
-                print("[Spell Timer] Match ended.")
-                self.root.withdraw()
-                self._save_config()
-                self.game_active = False
-                self.enemy_data_cache.clear()
-                
-        self.root.after(Config.CHECK_INTERVAL, self._monitor_game_loop)
+            self._reconcile_rows(enemies)
 
-    def _build_enemy_rows(self, enemies: List[Dict]):
-        # Full rebuild (only on game start)
-        for widget in self.enemies_frame.winfo_children(): widget.destroy()
-        self._img_refs.clear()
+    def _on_haste_changed(self, deltas: List[Tuple[str, int, int]]):
+        for champ, old, new in deltas:
+            print(f"[Spell Timer] Haste changed for {champ}: {old} -> {new}")
+
+    def _on_game_end(self, event: GameEvent):
+        # Hide right away instead of waiting for the client to go away
+        print(f"[Spell Timer] GameEnd event ({event.data.get('Result', '?')}).")
+        self.timers.clear()
+        self.engine.end_match()
+        self._on_no_game()
 
-        if not enemies: return
+    def _on_no_game(self):
+        if self.game_active:
+            print("[Spell Timer] Match ended.")
+            self.root.withdraw()
+            self._save_config()
+            self.game_active = False
+
+    def start_sync(self, serve: Optional[Tuple[str, int]] = None, join: Optional[Tuple[str, int]] = None):
+        """Shares timers with other overlays: serve a hub, join one, or both off."""
+        if not (serve or join): return
+        self.sync = TimerSync(lambda msg: self.poll_queue.put(("sync", msg)))
+        self.sync.attach(self.engine)
+        if serve: self.sync.serve(*serve)
+        else: self.sync.join(*join)
 
-        for i, enemy in enumerate(enemies):
-            if i > 0 and Config.SHOW_SEPARATOR:
-                sep = tk.Frame(self.enemies_frame, bg=Config.COLOR_SEPARATOR, height=1)
-                sep.pack(fill="x", padx=10, pady=2)
+    def _apply_sync(self, msg: Dict):
+        # A peer's message must never stop the monitor loop from rescheduling itself
+        try:
+            self.sync.apply(self.engine, msg)
+        except Exception as e:
+            print(f"[Sync] Ignored a message that failed to apply: {e}")
 
-            row = tk.Frame(self.enemies_frame, bg=Config.COLOR_BG)
-            row.pack(fill="x", pady=Config.ROW_PADDING_Y)
+    def _on_engine_event(self, event: str, data: Dict):
+        # Local clicks already updated their widget; a peer's start/reset is shown here
+        if not data.get("remote"): return
+        for row in self.rows.values():
+            for timer in row.spells:
+                if timer.champ_name == data["champ"] and timer.spell_name == data["spell"]:
+                    if event == "started": timer._start_timer(data["deadline"])
+                    elif timer.is_active: timer._reset()
 
-            champ_icon = AssetManager.load_icon("champions", enemy['champ'], (Config.ICON_SIZE, Config.ICON_SIZE), is_round=True)
-            self._img_refs.append(champ_icon)
-            lbl = tk.Label(row, image=champ_icon, bg=Config.COLOR_BG, bd=0)
-            lbl.pack(side="left", padx=(0, 8))
+    def _attach_timers(self, row):
+        """Shows the engine's running cooldowns on a new or re-spelled row (restored, reconnected)."""
+        for timer in row.spells:
+            deadline = self.engine.deadline(timer.champ_name, timer.spell_name)
+            if deadline is not None and not timer.is_active:
+                timer._start_timer(deadline)
 
-            for s_name in [enemy['spell1'], enemy['spell2']]:
-                # Pass 'self' (app) reference so the button can query cache
-                sw = SpellTimerWidget(row, enemy['champ'], s_name, self)
-                sw.pack(side="left", padx=3)
-                self._img_refs.append(sw.icon_img)
-                self._img_refs.append(sw.dim_img)
+    @Metrics.timed("build_rows")
+    def _build_enemy_rows(self, enemies: List[Dict]):
+        # Full rebuild (game start): drops every row and running timer
+        self.timers.clear()
+        for row in self.rows.values(): row.destroy()
+        self.rows = {}
+        self._reconcile_rows(enemies)
+
+    @staticmethod
+    def _row_keys(enemies: List[Dict]) -> List[Tuple[str, str, int]]:
+        # (team, champion, occurrence): unique even with duplicate champions in custom modes
+        seen: Dict[Tuple[str, str], int] = {}
+        keys = []
+        for enemy in enemies:
+            base = (enemy.get('team', ""), enemy['champ'])
+            seen[base] = seen.get(base, 0) + 1
+            keys.append(base + (seen[base],))
+        return keys
+
+    @Metrics.timed("reconcile_rows")
+    def _reconcile_rows(self, enemies: List[Dict]):
+        """Updates the panel to `enemies`, touching only rows that were added, removed, moved or re-spelled."""
+        rows = {}
+        added = updated = 0
+        for key, enemy in zip(OverlayApp._row_keys(enemies), enemies):
+            row = self.rows.pop(key, None)
+            if row is None:
+                row = self.panel.add_row(enemy, self)
+                self._attach_timers(row)
+                added += 1
+            elif row.set_spells(enemy):
+                self._attach_timers(row)
+                updated += 1
+            rows[key] = row
+        removed = len(self.rows)
+        for row in self.rows.values(): row.destroy()
+        self.rows = rows
+        self.panel.layout(list(rows.values()))
+        if self.game_active and (added or removed or updated):
+            print(f"[Spell Timer] Roster changed: +{added} -{removed} ~{updated}")
 
     def _apply_native_styles(self):
         hwnd = ctypes.windll.user32.GetParent(self.root.winfo_id())
@@ -542,11 +2343,157 @@ class OverlayApp:
     def run(self):
         self.root.mainloop()
 
+# --- HEADLESS MODE ---
+class HeadlessRunner:
+    """Drives a TimerEngine without Tk (--headless).
+
+    Reads one JSON command per stdin line and writes engine events to stdout as
+    JSON lines ({"event": ..., ...}); logs go to stderr. Commands:
+      {"cmd": "start" | "reset", "champ": ..., "spell": ...}
+      {"cmd": "snapshot"}
+      {"cmd": "roster", "enemies": [{"champ", "spell1", "spell2", "haste"?, "team"?}, ...]}
+      {"cmd": "clock", "game_time": seconds}
+      {"cmd": "match", "id": ...}   (match id for --sync-* without polling)
+      {"cmd": "quit"}
+    With polling on, the Live Client feeds roster/clock/match exactly as for the overlay.
+    """
+    def __init__(self, poll: bool = True, out=None, serve: Optional[Tuple[str, int]] = None,
+                 join: Optional[Tuple[str, int]] = None):
+        self.out = out or sys.stdout
+        self.inbox: "queue.Queue[Tuple[str, Any]]" = queue.Queue()
+        self.engine = TimerEngine()
+        self.engine.listeners.append(self._write)
+        self.poller = GameDataPoller(self.inbox) if poll else None
+        self.in_game = False
+        self.sync: Optional[TimerSync] = None
+        if serve or join:
+            self.sync = TimerSync(lambda msg: self.inbox.put(("sync", msg)))
+            self.sync.attach(self.engine)
+            if serve: self.sync.serve(*serve)
+            else: self.sync.join(*join)
+
+    def _write(self, event: str, data: Dict):
+        self.out.write(json.dumps({"event": event, **data}) + "\n")
+        self.out.flush()
+
+    def _read_stdin(self):
+        for line in sys.stdin:
+            if line.strip():
+                self.inbox.put(("command", line))
+        self.inbox.put(("command", None)) # EOF
+
+    def run(self) -> int:
+        threading.Thread(target=self._read_stdin, name="HeadlessStdin", daemon=True).start()
+        if self.poller:
+            self.poller.events.subscribe(EventStream.GAME_END, lambda event: self.engine.end_match())
+            self.poller.start()
+        while True:
+            # Sleep until the next message or the soonest cooldown end, whichever comes first
+            next_deadline = self.engine.next_deadline()
+            timeout = None
+            if next_deadline is not None and not self.engine.clock.paused:
+                timeout = max(0.0, next_deadline - self.engine.clock.now())
+            try:
+                kind, payload = self.inbox.get(timeout=timeout)
+            except queue.Empty:
+                self.engine.expire_due()
+                continue
+            if kind == "command":
+                if payload is None or not self._command(payload):
+                    break
+            else:
+                self._poll_message(kind, payload)
+            self.engine.expire_due()
+        if self.poller: self.poller.stop()
+        return 0
+
+    def _poll_message(self, kind: str, payload: Any):
+        if kind == "sync":
+            try:
+                self.sync.apply(self.engine, payload)
+            except Exception as e:
+                print(f"[Sync] Ignored a message that failed to apply: {e}")
+        elif kind == "event":
+            self.poller.events.dispatch(payload)
+        elif kind == "match":
+            self.engine.set_match(payload)
+        elif kind == "clock":
+            self.engine.sync_clock(*payload)
+        elif kind == "roster":
+            self.in_game = True
+            self.engine.update_roster(payload)
+        elif kind == "no_game" and self.in_game:
+            # Sent on every idle poll: report the transition only
+            self.in_game = False
+            self._write("no_game", {})
+
+    def _command(self, line: str) -> bool:
+        """Applies one stdin command. Returns False to stop."""
+        try:
+            cmd = json.loads(line)
+            name = cmd.get("cmd")
+            if name == "quit":
+                return False
+            elif name == "start":
+                self.engine.start(cmd["champ"], cmd["spell"])
+            elif name == "reset":
+                if not self.engine.reset(cmd["champ"], cmd["spell"]):
+                    self._write("error", {"error": "not running", "cmd": cmd})
+            elif name == "snapshot":
+                self._write("snapshot", self.engine.snapshot())
+            elif name == "roster":
+                self.engine.update_roster([{"haste": 0, "team": "", **enemy} for enemy in cmd["enemies"]])
+            elif name == "clock":
+                self.engine.sync_clock(float(cmd["game_time"]), time.monotonic())
+            elif name == "match":
+                self.engine.set_match(str(cmd["id"]))
+            else:
+                self._write("error", {"error": f"unknown command {name!r}"})
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            self._write("error", {"error": f"bad command: {e}", "line": line.strip()})
+        return True
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enemy summoner spell timer overlay.")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Print per-phase startup timings (imports, DDragon, Tk root, tray, first poll)")
+    parser.add_argument("--metrics", action="store_true",
+                        help=f"Time hot paths and log p50/p95/max every {Config.METRICS_LOG_INTERVAL} s")
+    parser.add_argument("--metrics-port", type=int, nargs="?", const=Config.METRICS_PORT, metavar="PORT",
+                        help=f"Also serve the metrics as JSON on 127.0.0.1:PORT/metrics (default {Config.METRICS_PORT}); implies --metrics")
+    parser.add_argument("--headless", action="store_true",
+                        help="No overlay: read JSON commands from stdin, write timer events to stdout as JSON lines")
+    parser.add_argument("--no-poll", action="store_true",
+                        help="With --headless: don't poll the Live Client (roster/clock come from stdin)")
+    parser.add_argument("--sync-serve", nargs="?", const=f"0.0.0.0:{Config.SYNC_PORT}", metavar="[HOST:]PORT",
+                        help=f"Share timers: run a hub other overlays can join (default 0.0.0.0:{Config.SYNC_PORT})")
+    parser.add_argument("--sync-join", metavar="HOST[:PORT]",
+                        help="Share timers with the hub at HOST (another overlay started with --sync-serve)")
+    args = parser.parse_args()
+    if args.sync_serve and args.sync_join:
+        parser.error("--sync-serve and --sync-join are mutually exclusive")
+    sync_serve = TimerSync.parse_address(args.sync_serve, "0.0.0.0") if args.sync_serve else None
+    sync_join = TimerSync.parse_address(args.sync_join, "127.0.0.1") if args.sync_join else None
+    if args.profile_startup:
+        StartupProfiler.enable()
+    if args.metrics or args.metrics_port is not None:
+        Metrics.enable(args.metrics_port)
+
+    if args.headless:
+        # stdout carries the JSON lines; every [Tag] log line goes to stderr
+        out, sys.stdout = sys.stdout, sys.stderr
+        DDragonManager.load_cached()
+        DDragonManager.start_background_update()
+        sys.exit(HeadlessRunner(poll=not args.no_poll, out=out, serve=sync_serve, join=sync_join).run())
+
     checker = SingleInstanceChecker()
     if checker.is_already_running():
         sys.exit(0)
 
-    DDragonManager.update_timers()
-    app = OverlayApp()
+    with StartupProfiler.phase("ddragon cache"):
+        DDragonManager.load_cached()
+    DDragonManager.start_background_update()
+    with StartupProfiler.phase("overlay init"):
+        app = OverlayApp()
+    app.start_sync(sync_serve, sync_join)
     app.run()
\ No newline at end of file
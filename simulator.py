@@ -0,0 +1,393 @@
+"""
+Live Client Data simulator for Spell Timer.
+Lets the overlay, poller and timers run without a League client.
+
+- record:  polls a real client's /allgamedata and stores timestamped frames
+           in a compact recording (gzip JSON lines, unchanged frames skipped).
+- replay:  serves a recording or a scenario on the Live Client endpoints
+           (allgamedata, playerlist, activeplayername, eventdata, gamestats,
+           playeritems) at 1x, 10x or as fast as possible (--speed 0: every
+           request advances one frame).
+- compile: turns a scenario into a recording.
+
+Scenarios are JSON files describing a match step by step, e.g.:
+    {"players": [{"champ": "Ahri", "team": "ORDER", "me": true,
+                  "spells": ["SummonerFlash", "SummonerDot"]}, ...],
+     "steps": [{"at": 0,   "action": "loading"},
+               {"at": 5,   "action": "start"},
+               {"at": 60,  "action": "buy", "champ": "Darius", "item": 3158},
+               {"at": 90,  "action": "disconnect", "duration": 10},
+               {"at": 300, "action": "end", "result": "Win"}]}
+Use "demo" as the file name for a built-in scenario covering all of the above.
+
+Point the app at the server with the default port/HTTPS (no change needed), or:
+    SPELLTIMER_LCL_URL=http://127.0.0.1:2999/liveclientdata python main.py
+"""
+
+import os
+import sys
+import ssl
+import copy
+import gzip
+import json
+import time
+import bisect
+import argparse
+import tempfile
+import threading
+import subprocess
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+RECORDING_FORMAT = "spelltimer-recording"
+RECORDING_VERSION = 1
+
+# Frame states
+IN_GAME = "in_game"     # data holds an allgamedata payload
+LOADING = "loading"     # API answers 404 (loading screen)
+CLOSED = "closed"       # Connection dropped (client not running / disconnect)
+
+END_LINGER = 10         # Seconds the end screen stays up after "end" before the client closes
+
+DEMO_SCENARIO = {
+    "players": [
+        {"champ": "Ahri", "team": "ORDER", "me": True, "spells": ["SummonerFlash", "SummonerDot"]},
+        {"champ": "Garen", "team": "ORDER", "spells": ["SummonerFlash", "SummonerTeleport"]},
+        {"champ": "Darius", "team": "CHAOS", "spells": ["SummonerFlash", "SummonerTeleport"]},
+        {"champ": "Ornn", "team": "CHAOS", "spells": ["SummonerFlash", "SummonerTeleport"]},
+        {"champ": "Lux", "team": "CHAOS", "spells": ["SummonerFlash", "SummonerBarrier"]},
+    ],
+    "steps": [
+        {"at": 0, "action": "loading"},
+        {"at": 5, "action": "start"},
+        {"at": 65, "action": "buy", "champ": "Darius", "item": 3158},
+        {"at": 95, "action": "buy", "champ": "Ornn", "item": 3171},
+        {"at": 120, "action": "disconnect", "duration": 8},
+        {"at": 300, "action": "end", "result": "Win"},
+    ],
+}
+
+# --- RECORDINGS ---
+def save_recording(path, frames):
+    """Writes [(t, state, data)] frames, skipping frames identical to the previous one.
+    Returns the number of frames written."""
+    opener = gzip.open if path.endswith(".gz") else open
+    last = None
+    written = 0
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write(json.dumps({"format": RECORDING_FORMAT, "version": RECORDING_VERSION}) + "\n")
+        for t, state, data in frames:
+            if (state, data) == last:
+                continue
+            last = (state, data)
+            f.write(json.dumps({"t": round(t, 3), "state": state, "data": data}, separators=(",", ":")) + "\n")
+            written += 1
+    return written
+
+def load_recording(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+        if header.get("format") != RECORDING_FORMAT:
+            raise ValueError(f"{path} is not a Spell Timer recording")
+        return [(frame["t"], frame["state"], frame["data"]) for frame in map(json.loads, f) if frame]
+
+def record(args):
+    """Polls a real client and writes every change to the recording."""
+    from main import Config, GameDataManager
+
+    session = GameDataManager._get_session()
+    frames = []
+    started = time.monotonic()
+    seen_game = False
+    print(f"[Record] Polling {Config.LCL_URL} every {args.interval}s, Ctrl+C to stop...")
+    try:
+        while True:
+            t = time.monotonic() - started
+            try:
+                resp = session.get(Config.LCL_URL, timeout=1)
+                if resp.status_code == 200:
+                    frames.append((t, IN_GAME, resp.json()))
+                    seen_game = True
+                else:
+                    frames.append((t, LOADING, None))
+            except Exception:
+                frames.append((t, CLOSED, None))
+                if seen_game and not args.keep_going:
+                    print("[Record] Client closed, stopping.")
+                    break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    written = save_recording(args.output, frames)
+    print(f"[Record] {len(frames)} polls, {written} distinct frames written to {args.output} "
+          f"({os.path.getsize(args.output) / 1024:.0f} KB)")
+
+# --- SCENARIOS ---
+def _spell_entry(spell_id):
+    name = spell_id[len("Summoner"):] if spell_id.startswith("Summoner") else spell_id
+    return {"displayName": name, "rawDisplayName": f"GeneratedTip_SummonerSpell_{spell_id}_DisplayName"}
+
+def _player_entry(player):
+    riot_id = player.get("riotId", f"{player['champ']}Player#SIM")
+    spells = player.get("spells", ["SummonerFlash", "SummonerHeal"])
+    return {
+        "championName": player["champ"],
+        "rawChampionName": f"game_character_displayname_{player['champ']}",
+        "riotId": riot_id,
+        "summonerName": riot_id.split("#")[0],
+        "team": player["team"],
+        "level": 1,
+        "isDead": False,
+        "items": [{"itemID": item, "slot": i} for i, item in enumerate(player.get("items", []))],
+        "summonerSpells": {"summonerSpellOne": _spell_entry(spells[0]), "summonerSpellTwo": _spell_entry(spells[1])},
+        "scores": {"kills": 0, "deaths": 0, "assists": 0, "creepScore": 0, "wardScore": 0.0},
+    }
+
+def compile_scenario(scenario, tick=1.0):
+    """Expands a scenario into per-tick [(t, state, data)] frames."""
+    players = [_player_entry(p) for p in scenario["players"]]
+    me = next((p for p, spec in zip(players, scenario["players"]) if spec.get("me")), players[0])
+    by_champ = {p["championName"]: p for p in players}
+    steps = sorted(scenario["steps"], key=lambda s: s["at"])
+    if not steps:
+        return []
+
+    events = []
+    state = CLOSED
+    started_at = None
+    disconnected_until = -1.0
+    end_at = None
+    frames = []
+    pending = list(steps)
+    last_at = steps[-1]["at"] + (END_LINGER if steps[-1]["action"] == "end" else 1) + tick
+    t = 0.0
+    while t <= last_at:
+        while pending and pending[0]["at"] <= t:
+            step = pending.pop(0)
+            action = step["action"]
+            if action == "loading":
+                state = LOADING
+            elif action == "start":
+                state, started_at = IN_GAME, step["at"]
+                events.append({"EventID": len(events), "EventName": "GameStart", "EventTime": 0.0})
+            elif action == "buy":
+                items = by_champ[step["champ"]]["items"]
+                items.append({"itemID": step["item"], "slot": len(items)})
+            elif action == "sell":
+                items = by_champ[step["champ"]]["items"]
+                items[:] = [i for i in items if i["itemID"] != step["item"]]
+            elif action == "disconnect":
+                disconnected_until = step["at"] + step.get("duration", 5)
+            elif action == "end":
+                end_at = step["at"]
+                events.append({"EventID": len(events), "EventName": "GameEnd",
+                               "EventTime": end_at - (started_at or 0), "Result": step.get("result", "Win")})
+            else:
+                raise ValueError(f"Unknown scenario action: {action}")
+
+        if end_at is not None and t >= end_at + END_LINGER:
+            frames.append((t, CLOSED, None))
+        elif t < disconnected_until or state != IN_GAME:
+            frames.append((t, CLOSED if t < disconnected_until else state, None))
+        else:
+            game_time = t - started_at
+            frames.append((t, IN_GAME, {
+                "activePlayer": {"riotId": me["riotId"], "summonerName": me["summonerName"], "level": 1},
+                "allPlayers": copy.deepcopy(players),
+                "events": {"Events": list(events)},
+                "gameData": {"gameMode": scenario.get("gameMode", "CLASSIC"), "gameTime": game_time,
+                             "mapName": "Map11", "mapNumber": 11, "mapTerrain": "Default"},
+            }))
+        t += tick
+    return frames
+
+def load_frames(path):
+    """Recording (.jsonl / .jsonl.gz), scenario (.json with "steps") or "demo"."""
+    if path == "demo":
+        return compile_scenario(DEMO_SCENARIO)
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            return compile_scenario(json.load(f))
+    return load_recording(path)
+
+def compile_cmd(args):
+    frames = load_frames(args.scenario)
+    written = save_recording(args.output, frames)
+    print(f"[Compile] {written} frames written to {args.output}")
+
+# --- REPLAY SERVER ---
+class ReplayClock:
+    """Picks the frame to serve. speed > 0 follows wall time; speed 0 advances per request."""
+    def __init__(self, frames, speed=1.0, loop=False):
+        self.frames = frames
+        self.times = [frame[0] for frame in frames]
+        # The loop period includes the last frame's own interval so it gets served too
+        last_gap = self.times[-1] - self.times[-2] if len(frames) > 1 else 1.0
+        self.period = max(self.times[-1] + last_gap, 1e-6)
+        self.speed = speed
+        self.loop = loop
+        self.started = time.monotonic()
+        self.index = 0
+        self.lock = threading.Lock()
+
+    def current(self):
+        with self.lock:
+            if self.speed <= 0:
+                frame = self.frames[min(self.index, len(self.frames) - 1)]
+                self.index += 1
+                if self.loop and self.index >= len(self.frames):
+                    self.index = 0
+                return frame
+            t = (time.monotonic() - self.started) * self.speed
+            if self.loop:
+                t %= self.period
+            # Searched on every call: after a loop wrap, t goes back to the start
+            self.index = max(bisect.bisect_right(self.times, t) - 1, 0)
+            return self.frames[self.index]
+
+    def finished(self):
+        return not self.loop and self.index >= len(self.frames) - 1
+
+def _endpoint_payload(endpoint, query, data):
+    """Derives a Live Client endpoint's response from an allgamedata frame (None = 404)."""
+    active = data.get("activePlayer", {})
+    players = data.get("allPlayers", [])
+    if endpoint == "allgamedata":
+        return data
+    if endpoint == "playerlist":
+        return players
+    if endpoint == "activeplayername":
+        return active.get("riotId") or active.get("summonerName")
+    if endpoint == "activeplayer":
+        return active
+    if endpoint == "gamestats":
+        return data.get("gameData")
+    if endpoint == "eventdata":
+        first_id = int(query.get("eventID", ["0"])[0])
+        events = data.get("events", {}).get("Events", [])
+        return {"Events": [e for e in events if e.get("EventID", 0) >= first_id]}
+    if endpoint == "playeritems":
+        riot_id = query.get("riotId", [""])[0]
+        for p in players:
+            if riot_id in (p.get("riotId"), p.get("summonerName")):
+                return p.get("items", [])
+    return None
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    clock = None  # Set by serve()
+    protocol_version = "HTTP/1.1" # Keep-alive like the real client
+    disable_nagle_algorithm = True # Headers and body are separate writes; avoid the 40 ms delayed-ACK stall
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        _, state, data = self.clock.current()
+        if state == CLOSED:
+            # Drop the connection: requests sees it like a refused/closed client
+            self.close_connection = True
+            self.connection.close()
+            return
+
+        payload = None
+        if state == IN_GAME and url.path.startswith("/liveclientdata/"):
+            payload = _endpoint_payload(url.path.rsplit("/", 1)[-1], parse_qs(url.query), data)
+        if payload is None:
+            body = json.dumps({"errorCode": "RESOURCE_NOT_FOUND", "httpStatus": 404}).encode()
+            self.send_response(404)
+        else:
+            body = json.dumps(payload).encode()
+            self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def _self_signed_context(tmp_dir):
+    """Builds a TLS context with a throwaway self-signed cert (needs the openssl CLI)."""
+    cert = os.path.join(tmp_dir, "cert.pem")
+    key = os.path.join(tmp_dir, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-subj", "/CN=127.0.0.1", "-keyout", key, "-out", cert],
+                   check=True, capture_output=True)
+    return cert, key
+
+def serve(frames, host="127.0.0.1", port=2999, speed=1.0, loop=False, use_tls=True, certfile=None, keyfile=None):
+    """Starts the replay server on a daemon thread and returns (server, clock)."""
+    handler = type("BoundReplayHandler", (ReplayHandler,), {"clock": ReplayClock(frames, speed, loop)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    if use_tls:
+        if not certfile:
+            certfile, keyfile = _self_signed_context(tempfile.mkdtemp(prefix="spelltimer-sim-"))
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    threading.Thread(target=server.serve_forever, name="ReplayServer", daemon=True).start()
+    return server, handler.clock
+
+def replay(args):
+    frames = load_frames(args.source)
+    if not frames:
+        print("[Replay] Nothing to replay.")
+        return 1
+    use_tls = not args.http
+    try:
+        server, clock = serve(frames, args.host, args.port, args.speed, args.loop, use_tls, args.certfile, args.keyfile)
+    except (OSError, subprocess.CalledProcessError) as e:
+        if not use_tls or args.certfile:
+            raise
+        print(f"[Replay] Could not create a self-signed certificate ({e}); falling back to plain HTTP.")
+        use_tls = False
+        server, clock = serve(frames, args.host, args.port, args.speed, args.loop, use_tls)
+
+    scheme = "https" if use_tls else "http"
+    speed = "max" if args.speed <= 0 else f"{args.speed:g}x"
+    print(f"[Replay] {len(frames)} frames ({frames[-1][0]:.0f}s) at {speed} on {scheme}://{args.host}:{args.port}/liveclientdata")
+    if scheme == "http" or args.port != 2999:
+        print(f"[Replay] Start the app with SPELLTIMER_LCL_URL={scheme}://{args.host}:{args.port}/liveclientdata")
+    try:
+        while not clock.finished():
+            time.sleep(0.2)
+        print("[Replay] Reached the last frame; still serving it (Ctrl+C to stop).")
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record/replay Live Client Data for Spell Timer.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("record", help="Record a real match")
+    p.add_argument("output", help="Recording file (.jsonl or .jsonl.gz)")
+    p.add_argument("--interval", type=float, default=1.0, help="Seconds between polls")
+    p.add_argument("--keep-going", action="store_true", help="Keep recording after the client closes")
+    p.set_defaults(func=record)
+
+    p = sub.add_parser("replay", help="Serve a recording or scenario on the Live Client endpoints")
+    p.add_argument("source", help='Recording, scenario .json, or "demo"')
+    p.add_argument("--speed", type=float, default=1.0, help="1 = real time, 10 = 10x, 0 = one frame per request")
+    p.add_argument("--loop", action="store_true", help="Start over after the last frame")
+    p.add_argument("--host", default="127.0.0.1")
+    p.add_argument("--port", type=int, default=2999)
+    p.add_argument("--http", action="store_true", help="Serve plain HTTP instead of HTTPS")
+    p.add_argument("--certfile", help="TLS certificate (default: generated self-signed)")
+    p.add_argument("--keyfile", help="TLS key for --certfile")
+    p.set_defaults(func=replay)
+
+    p = sub.add_parser("compile", help="Turn a scenario into a recording")
+    p.add_argument("scenario", help='Scenario .json or "demo"')
+    p.add_argument("output", help="Recording file (.jsonl or .jsonl.gz)")
+    p.set_defaults(func=compile_cmd)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())